@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright
+
+LOGGER = logging.getLogger(__name__)
+CHROMIUM_LAUNCH_ARGS: tuple[str, ...] = (
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+)
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "stylesheet", "media"})
+
+
+def _block_heavy_resources(route) -> None:
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+class BrowserSession:
+    """Lazily launched Chromium shared by every browser-backed step of a run.
+
+    With user_data_dir set, Chromium runs on a persistent profile so DNS, HTTP
+    cache and cookies survive between runs; that single context is shared.
+    """
+
+    def __init__(self, headless: bool = True, user_data_dir: Path | None = None):
+        self.headless = headless
+        self.user_data_dir = user_data_dir
+        self._playwright = None
+        self._browser = None
+        self._persistent_context = None
+
+    def _ensure_playwright(self):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        return self._playwright
+
+    @property
+    def browser(self):
+        if self._browser is None:
+            LOGGER.info("Launching shared Chromium browser (headless=%s)", self.headless)
+            self._browser = self._ensure_playwright().chromium.launch(
+                headless=self.headless,
+                args=list(CHROMIUM_LAUNCH_ARGS),
+            )
+        return self._browser
+
+    def _persistent(self):
+        if self._persistent_context is None:
+            LOGGER.info("Launching Chromium with persistent profile %s", self.user_data_dir)
+            self.user_data_dir.mkdir(parents=True, exist_ok=True)
+            self._persistent_context = self._ensure_playwright().chromium.launch_persistent_context(
+                str(self.user_data_dir),
+                headless=self.headless,
+                args=list(CHROMIUM_LAUNCH_ARGS),
+            )
+            self._persistent_context.route("**/*", _block_heavy_resources)
+        return self._persistent_context
+
+    def new_context(self):
+        """Context that skips images, fonts, stylesheets and media."""
+        if self.user_data_dir is not None:
+            return self._persistent()
+        context = self.browser.new_context()
+        context.route("**/*", _block_heavy_resources)
+        return context
+
+    @contextmanager
+    def acquire_page(self):
+        if self.user_data_dir is not None:
+            page = self._persistent().new_page()
+            try:
+                yield page
+            finally:
+                page.close()
+            return
+
+        context = self.new_context()
+        try:
+            yield context.new_page()
+        finally:
+            context.close()
+
+    def close(self) -> None:
+        if self._persistent_context is not None:
+            self._persistent_context.close()
+            self._persistent_context = None
+        if self._browser is not None:
+            self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+
+@contextmanager
+def playwright_session(
+    headless: bool = True,
+    user_data_dir: Path | None = None,
+) -> Iterator[BrowserSession]:
+    session = BrowserSession(headless=headless, user_data_dir=user_data_dir)
+    try:
+        yield session
+    finally:
+        session.close()
@@ -31,15 +31,61 @@ def parse_args() -> argparse.Namespace:
         help="Storage backend (duckdb recommended for append-heavy periodic loads)",
     )
     parser.add_argument("--duckdb-path", default="data/denue_historical.duckdb")
+    parser.add_argument(
+        "--duckdb-threads",
+        type=int,
+        default=None,
+        help="DuckDB worker threads (default: DuckDB picks one per core)",
+    )
+    parser.add_argument(
+        "--duckdb-memory-limit",
+        default=None,
+        help="DuckDB memory limit, e.g. 4GB (default: DuckDB's 80%% of RAM)",
+    )
     parser.add_argument("--parquet-dir", default="data/parquet")
     parser.add_argument("--report-path", default="reports/extraction_report.json")
     parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument(
+        "--download-concurrency",
+        type=int,
+        default=4,
+        help="Number of zip downloads kept in flight while earlier files are processed",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=2,
+        help="Number of files parsed and normalized concurrently (writes stay serialized)",
+    )
+    parser.add_argument(
+        "--no-keep-downloads",
+        action="store_true",
+        default=False,
+        help="Stream zips over HTTP Range requests instead of saving them under --download-dir",
+    )
     parser.add_argument("--max-files", type=int, default=None)
     parser.add_argument(
         "--federations",
         default=None,
         help="Optional comma-separated federation IDs to process, e.g. 09,15,31-33",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="Ignore and do not write the 24h discovered-links cache under the download dir",
+    )
+    parser.add_argument(
+        "--reingest",
+        action="store_true",
+        default=False,
+        help="Process links again even if the DuckDB ingested_files ledger lists them",
+    )
+    parser.add_argument(
+        "--browser-profile-dir",
+        default=None,
+        help="Persistent Chromium profile reused across runs (one run at a time); default: a fresh profile",
+    )
     parser.add_argument("--headless", action="store_true", default=False)
     parser.add_argument("--log-level", default="INFO")
     return parser.parse_args()
@@ -63,10 +109,18 @@ def main() -> int:
         parquet_dir=Path(args.parquet_dir),
         report_path=Path(args.report_path),
         chunk_size=args.chunk_size,
+        download_concurrency=args.download_concurrency,
+        parse_workers=args.parse_workers,
+        keep_downloaded=not args.no_keep_downloads,
+        duckdb_threads=args.duckdb_threads,
+        duckdb_memory_limit=args.duckdb_memory_limit,
         max_files=args.max_files,
         federation_filter=_csv_to_set(args.federations),
         headless=args.headless,
         login=login_config,
+        use_link_cache=not args.no_cache,
+        skip_ingested=not args.reingest,
+        browser_profile_dir=Path(args.browser_profile_dir) if args.browser_profile_dir else None,
     )
 
     run_pipeline(config)
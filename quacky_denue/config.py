@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 
@@ -22,7 +22,37 @@ class PipelineConfig:
     parquet_dir: Path
     report_path: Path
     chunk_size: int = 50_000
+    download_concurrency: int = 4
+    parse_workers: int = 2
+    keep_downloaded: bool = True
+    duckdb_threads: int | None = None
+    duckdb_memory_limit: str | None = None
     headless: bool = True
     max_files: int | None = None
     federation_filter: set[str] | None = None
     login: LoginConfig | None = None
+    use_link_cache: bool = True
+    skip_ingested: bool = True
+    # opt-in: a persistent Chromium profile can only be used by one run at a time
+    browser_profile_dir: Path | None = None
+    _link_cache_dir: Path | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # paths stay as given (not resolved) because download paths end up in each row's source_file
+        self.download_dir = Path(self.download_dir)
+        self.duckdb_path = Path(self.duckdb_path)
+        self.parquet_dir = Path(self.parquet_dir)
+        self.report_path = Path(self.report_path)
+        if self.browser_profile_dir is not None:
+            self.browser_profile_dir = Path(self.browser_profile_dir)
+
+    @property
+    def link_cache_dir(self) -> Path:
+        """<download_dir>/.cache unless set explicitly, so it follows later download_dir changes."""
+        if self._link_cache_dir is not None:
+            return self._link_cache_dir
+        return self.download_dir / ".cache"
+
+    @link_cache_dir.setter
+    def link_cache_dir(self, value: Path) -> None:
+        self._link_cache_dir = Path(value)
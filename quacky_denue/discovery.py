@@ -1,39 +1,183 @@
 from __future__ import annotations
 
+import json
 import logging
 import re
-from urllib.parse import urljoin, urlparse
+import time
+from dataclasses import asdict
+from functools import lru_cache
+from html.parser import HTMLParser
+from http.client import HTTPException
+from pathlib import Path
+from urllib.error import URLError
+from urllib.parse import urljoin
+from urllib.request import Request, urlopen
 
-from playwright.sync_api import TimeoutError, sync_playwright
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError
 
+from quacky_denue.browser_pool import BrowserSession, playwright_session
 from quacky_denue.config import PipelineConfig
-from quacky_denue.models import DownloadLink
+from quacky_denue.models import DownloadLink, DownloadLinkBatch
 from quacky_denue.retry import retry
 
 LOGGER = logging.getLogger(__name__)
-FEDERATION_PATTERN = re.compile(r"denue_([0-9]{1,2}(?:-[0-9]{1,2})?)_", re.IGNORECASE)
+# Whole-URL match so filtering and federation parsing are one regex pass:
+# no urlparse, lower(), suffix test or second search for the federation code.
 DENUE_CSV_ZIP_PATTERN = re.compile(
-    r"/contenidos/masiva/denue/[0-9]{4}/denue_[0-9]{2}(?:-[0-9]{2})?_[0-9]{8}(?:_csv|_shp)\.zip$",
+    r"^https?://[^/?#]+/contenidos/masiva/denue/[0-9]{4}/"
+    r"denue_(?P<federation>[0-9]{2}(?:-[0-9]{2})?)_[0-9]{4}(?:[0-9]{4}|_[0-9]{2})?_csv\.zip(?:[?#].*)?\Z",
     re.IGNORECASE,
 )
+# Anything the plain-HTTP fast path can raise before we fall back to the browser:
+# bad charset names raise LookupError, truncated bodies raise HTTPException.
+HTTP_FETCH_ERRORS: tuple[type[Exception], ...] = (URLError, OSError, ValueError, LookupError, HTTPException)
+BADGE_PATTERN = re.compile(r"<span[^>]*id=[\"']badge_denue[\"'][^>]*>\s*([0-9]+)\s*<", re.IGNORECASE)
+CSV_ZIP_HREF_MARKER = "_csv.zip"
+CSV_ZIP_ANCHOR_SELECTOR = f'a[href*="{CSV_ZIP_HREF_MARKER}" i]'
+BADGE_READY_SCRIPT = "() => (document.querySelector('span#badge_denue')?.innerText || '').trim().length > 0"
+ANCHORS_SCRIPT = "els => els.map(a => [a.href, (a.innerText || '').trim()])"
+HTTP_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) quacky-denue"
+LINK_CACHE_TTL_SECONDS = 24 * 60 * 60
+PAGE_HTML_TTL_SECONDS = 5 * 60
+LOGIN_RETRY_DEADLINE_SECONDS = 120
+
+_PAGE_HTML_CACHE: dict[str, tuple[float, str]] = {}
+
+
+@lru_cache(maxsize=8192)
+def _csv_zip_federation(url: str) -> str | None:
+    """Federation code of a DENUE csv zip URL, or None when url is not one."""
+    match = DENUE_CSV_ZIP_PATTERN.match(url)
+    return match["federation"] if match else None
 
 
 def is_denue_csv_zip_url(url: str) -> bool:
-    parsed = urlparse(url)
-    return bool(DENUE_CSV_ZIP_PATTERN.search(parsed.path)) and parsed.path.lower().endswith("_csv.zip")
+    return _csv_zip_federation(url) is not None
+
+
+class _AnchorCollector(HTMLParser):
+    """Collect (href, text) pairs for every anchor in a static HTML document."""
+
+    def __init__(self, href_contains: str | None = None) -> None:
+        super().__init__(convert_charrefs=True)
+        self.href_contains = href_contains.lower() if href_contains else None
+        self.anchors: list[tuple[str, str]] = []
+        self._href: str | None = None
+        self._text: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag != "a":
+            return
+        self._flush()
+        href = dict(attrs).get("href") or None
+        if href and self.href_contains and self.href_contains not in href.lower():
+            href = None
+        self._href = href
+        self._text = []
+
+    def handle_data(self, data: str) -> None:
+        if self._href is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "a":
+            self._flush()
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+
+    def _flush(self) -> None:
+        if self._href is not None:
+            self.anchors.append((self._href, "".join(self._text).strip()))
+        self._href = None
+        self._text = []
+
+
+def _fetch_page_html(url: str) -> str:
+    """GET url once per PAGE_HTML_TTL_SECONDS; discovery and validation share the body."""
+    cached = _PAGE_HTML_CACHE.get(url)
+    if cached is not None and time.monotonic() - cached[0] < PAGE_HTML_TTL_SECONDS:
+        return cached[1]
+
+    request = Request(url, headers={"User-Agent": HTTP_USER_AGENT})
+    with urlopen(request, timeout=30) as response:
+        charset = response.headers.get_content_charset() or "utf-8"
+        html = response.read().decode(charset, errors="replace")
+
+    _PAGE_HTML_CACHE[url] = (time.monotonic(), html)
+    return html
+
+
+def _parse_anchors(html: str, href_contains: str | None = None) -> list[tuple[str, str]]:
+    collector = _AnchorCollector(href_contains)
+    collector.feed(html)
+    collector.close()
+    return collector.anchors
+
+
+def _http_discover(url: str) -> list[tuple[str, str]]:
+    """Return raw anchors from the server-rendered page, or [] when unavailable."""
+    try:
+        html = _fetch_page_html(url)
+    except HTTP_FETCH_ERRORS as exc:
+        LOGGER.info("HTTP discovery failed for %s (%s), falling back to browser", url, exc)
+        return []
+    return _parse_anchors(html, href_contains=CSV_ZIP_HREF_MARKER)
+
+
+def _collect_links(
+    anchors: list[tuple[str, str]],
+    base_url: str | None,
+    federation_filter: set[str] | None = None,
+) -> list[DownloadLink]:
+    """Build deduplicated links from (href, text) pairs; base_url=None means hrefs are absolute."""
+    batch = DownloadLinkBatch()
+    seen: set[str] = set()
+    for href, text in anchors:
+        if not href:
+            continue
+        absolute_href = urljoin(base_url, href) if base_url else href
+        if absolute_href in seen:
+            continue
+        seen.add(absolute_href)
+        federation = _csv_zip_federation(absolute_href)
+        if federation is not None:
+            batch.append(absolute_href, text, federation)
+    return list(batch.for_federations(federation_filter))
+
+
+def _link_cache_path(config: PipelineConfig) -> Path:
+    return config.link_cache_dir / "links.json"
+
+
+def _link_cache_key(config: PipelineConfig) -> dict[str, object]:
+    federations = sorted(config.federation_filter) if config.federation_filter else None
+    return {"download_url": config.download_url, "federation_filter": federations}
+
+
+def _load_cached_links(config: PipelineConfig) -> list[DownloadLink] | None:
+    cache_path = _link_cache_path(config)
+    try:
+        if time.time() - cache_path.stat().st_mtime > LINK_CACHE_TTL_SECONDS:
+            return None
+        payload = json.loads(cache_path.read_text(encoding="utf-8"))
+        if payload.get("key") != _link_cache_key(config):
+            return None
+        return list(DownloadLinkBatch(**payload["links"])) or None
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
 
 
-def _parse_federation(href: str, text: str) -> str:
-    parsed = urlparse(href)
-    match = FEDERATION_PATTERN.search(href)
-    if not match:
-        match = FEDERATION_PATTERN.search(parsed.path)
-    if match:
-        fed = match.group(1)
-        if len(fed) == 1:
-            return fed.zfill(2)
-        return fed
-    return text.strip() or "unknown"
+def _store_cached_links(config: PipelineConfig, links: list[DownloadLink]) -> None:
+    cache_path = _link_cache_path(config)
+    payload = {"key": _link_cache_key(config), "links": asdict(DownloadLinkBatch.from_links(links))}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(payload, ensure_ascii=True), encoding="utf-8")
+    except OSError as exc:
+        LOGGER.warning("Could not write link cache %s: %s", cache_path, exc)
 
 
 def _perform_optional_login(page, config: PipelineConfig) -> None:
@@ -56,44 +200,62 @@ def _perform_optional_login(page, config: PipelineConfig) -> None:
         submit_btn.click(timeout=20_000)
         page.wait_for_load_state("networkidle", timeout=30_000)
 
-    retry("login", _login_once, retries=3, base_delay_seconds=2.0, logger=LOGGER)
+    retry(
+        "login",
+        _login_once,
+        retries=3,
+        base_delay_seconds=2.0,
+        logger=LOGGER,
+        retry_on=(PlaywrightError,),
+        max_elapsed_seconds=LOGIN_RETRY_DEADLINE_SECONDS,
+    )
 
 
-def discover_denue_links(config: PipelineConfig) -> list[DownloadLink]:
-    with sync_playwright() as playwright:
-        browser = playwright.chromium.launch(headless=config.headless)
-        context = browser.new_context()
-        page = context.new_page()
+def _browser_discover(config: PipelineConfig, session: BrowserSession | None) -> list[DownloadLink]:
+    if session is None:
+        with playwright_session(config.headless, config.browser_profile_dir) as owned_session:
+            return _browser_discover(config, owned_session)
 
-        page.goto(config.download_url, timeout=60_000)
-        page.wait_for_timeout(3_000)
+    with session.acquire_page() as page:
+        page.goto(config.download_url, timeout=60_000, wait_until="domcontentloaded")
         _perform_optional_login(page, config)
+        try:
+            page.wait_for_selector(CSV_ZIP_ANCHOR_SELECTOR, state="attached", timeout=15_000)
+        except TimeoutError:
+            LOGGER.warning("No csv zip anchors rendered on %s", config.download_url)
 
-        anchors = page.query_selector_all("a.aLink[href], a[href]")
-        links: list[DownloadLink] = []
+        # one round-trip for every anchor instead of two RPCs per element
+        anchors = page.eval_on_selector_all(CSV_ZIP_ANCHOR_SELECTOR, ANCHORS_SCRIPT)
 
-        for anchor in anchors:
-            href = anchor.get_attribute("href")
-            if not href:
-                continue
+    return _collect_links(anchors, None, config.federation_filter)
 
-            text = anchor.inner_text().strip()
-            absolute_href = urljoin(config.download_url, href)
-            if not is_denue_csv_zip_url(absolute_href):
-                continue
 
-            federation = _parse_federation(absolute_href, text)
-            links.append(DownloadLink(href=absolute_href, text=text, federation=federation))
+def _login_required(config: PipelineConfig) -> bool:
+    return bool(config.login and config.login.username and config.login.password)
 
-        browser.close()
 
-    unique_links: dict[str, DownloadLink] = {item.href: item for item in links}
-    deduped = list(unique_links.values())
+def discover_denue_links(
+    config: PipelineConfig,
+    session: BrowserSession | None = None,
+) -> list[DownloadLink]:
+    """Discover DENUE csv zip links, preferring a plain HTTP fetch over a browser.
 
-    if config.federation_filter:
-        filtered = [x for x in deduped if x.federation in config.federation_filter]
+    The browser is only launched when login is configured or when the raw HTML
+    carries no csv zip anchors (i.e. the page is rendered client-side). The
+    federation filter is applied while collecting, before links are built.
+    """
+    filtered = _load_cached_links(config) if config.use_link_cache else None
+    if filtered is not None:
+        LOGGER.info("Using cached link discovery from %s", _link_cache_path(config))
     else:
-        filtered = deduped
+        anchors = [] if _login_required(config) else _http_discover(config.download_url)
+        if anchors:
+            filtered = _collect_links(anchors, config.download_url, config.federation_filter)
+        else:
+            filtered = _browser_discover(config, session)
+
+        if filtered and config.use_link_cache:
+            _store_cached_links(config, filtered)
 
     if config.max_files is not None:
         filtered = filtered[: config.max_files]
@@ -102,17 +264,38 @@ def discover_denue_links(config: PipelineConfig) -> list[DownloadLink]:
     return filtered
 
 
-def validate_link_count(config: PipelineConfig, discovered_count: int) -> bool:
-    """Validate count against badge_denue when available."""
+def _http_badge_value(url: str) -> str | None:
     try:
-        with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(headless=config.headless)
-            page = browser.new_page()
-            page.goto(config.download_url, timeout=60_000)
-            page.wait_for_timeout(2_000)
-            badge_value = page.inner_text("span#badge_denue").strip()
-            browser.close()
+        html = _fetch_page_html(url)
+    except HTTP_FETCH_ERRORS:
+        return None
+    match = BADGE_PATTERN.search(html)
+    return match.group(1) if match else None
+
+
+def _browser_badge_value(config: PipelineConfig, session: BrowserSession | None) -> str:
+    if session is None:
+        with playwright_session(config.headless, config.browser_profile_dir) as owned_session:
+            return _browser_badge_value(config, owned_session)
 
+    with session.acquire_page() as page:
+        page.goto(config.download_url, timeout=60_000, wait_until="domcontentloaded")
+        page.wait_for_function(BADGE_READY_SCRIPT, timeout=15_000)
+        return page.inner_text("span#badge_denue").strip()
+
+
+def validate_link_count(
+    config: PipelineConfig,
+    discovered_count: int,
+    session: BrowserSession | None = None,
+) -> bool:
+    """Validate count against badge_denue when available."""
+    if discovered_count <= 0:
+        LOGGER.warning("Skipping badge validation: 0 links discovered")
+        return False
+
+    try:
+        badge_value = _http_badge_value(config.download_url) or _browser_badge_value(config, session)
         expected = max(int(badge_value) - 2, 0)
         return expected == discovered_count
     except (TimeoutError, ValueError):
@@ -1,14 +1,29 @@
 from __future__ import annotations
 
+import io
 import logging
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPException
 from pathlib import Path
+from urllib.error import HTTPError
 from urllib.parse import urlparse
-from urllib.request import urlopen
+from urllib.request import Request, urlopen
+from zipfile import BadZipFile, ZipFile
 
 from quacky_denue.models import DownloadLink
 from quacky_denue.retry import retry
 
 LOGGER = logging.getLogger(__name__)
+READ_BLOCK_SIZE = 1024 * 1024
+SEGMENT_SIZE = 8 * 1024 * 1024
+SEGMENT_WORKERS = 4
+# HTTPError and timeouts are OSErrors; truncated bodies raise HTTPException.
+RETRYABLE_ERRORS: tuple[type[Exception], ...] = (OSError, HTTPException)
+# 4xx answers are permanent except request timeout and rate limiting
+TRANSIENT_CLIENT_STATUSES = frozenset({408, 429})
+RETRY_DEADLINE_SECONDS = 300
 
 
 def _filename_from_url(url: str) -> str:
@@ -16,26 +31,222 @@ def _filename_from_url(url: str) -> str:
     return Path(path).name or "denue_download_csv.zip"
 
 
+def _is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, HTTPError) and 400 <= exc.code < 500:
+        return exc.code in TRANSIENT_CLIENT_STATUSES
+    return True
+
+
+def _is_intact_zip(path: Path) -> bool:
+    """True when path is a readable zip whose members all pass their CRC-32 check."""
+    try:
+        with ZipFile(path) as archive:
+            return archive.testzip() is None
+    except (BadZipFile, OSError, EOFError, zlib.error, NotImplementedError):
+        # zlib.error: corrupt deflate stream; NotImplementedError: unsupported compression
+        return False
+
+
+def _head(url: str) -> tuple[int | None, bool] | None:
+    """(Content-Length, byte ranges supported) from a HEAD request, or None when it fails."""
+    try:
+        with urlopen(Request(url, method="HEAD"), timeout=30) as response:
+            accept_ranges = (response.headers.get("Accept-Ranges") or "").lower()
+            length = response.headers.get("Content-Length")
+    except (*RETRYABLE_ERRORS, ValueError):
+        return None
+    size = int(length) if length and length.isdigit() else None
+    return size, accept_ranges == "bytes"
+
+
+def _probe_ranged_size(url: str) -> int | None:
+    """Return Content-Length when the server advertises byte ranges, else None."""
+    head = _head(url)
+    if head is None or not head[1]:
+        return None
+    return head[0]
+
+
+def _fetch_segment(url: str, fd: int, start: int, end: int) -> None:
+    request = Request(url, headers={"Range": f"bytes={start}-{end}"})
+    with urlopen(request, timeout=120) as response:
+        if response.status != 206:
+            raise OSError(f"server ignored Range bytes={start}-{end} (HTTP {response.status})")
+        buffer = memoryview(bytearray(READ_BLOCK_SIZE))
+        offset = start
+        while size := response.readinto(buffer):
+            os.pwrite(fd, buffer[:size], offset)
+            offset += size
+    if offset != end + 1:
+        raise OSError(f"short segment bytes={start}-{end}: got {offset - start} bytes")
+
+
+def _download_segmented(url: str, file_path: Path, size: int) -> Path:
+    """Fetch url as parallel Range segments written in place into a preallocated file."""
+    segments_path = file_path.with_name(f"{file_path.name}.segments")
+    fd = os.open(segments_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, size)
+        else:
+            os.ftruncate(fd, size)
+
+        def _segment(start: int) -> None:
+            end = min(start + SEGMENT_SIZE, size) - 1
+            retry(
+                operation_name=f"download:{file_path.name}[{start}-{end}]",
+                fn=lambda: _fetch_segment(url, fd, start, end),
+                retries=3,
+                base_delay_seconds=2,
+                logger=LOGGER,
+                retry_on=RETRYABLE_ERRORS,
+                should_retry=_is_transient,
+                max_elapsed_seconds=RETRY_DEADLINE_SECONDS,
+            )
+
+        with ThreadPoolExecutor(max_workers=SEGMENT_WORKERS) as pool:
+            for future in [pool.submit(_segment, start) for start in range(0, size, SEGMENT_SIZE)]:
+                future.result()
+    finally:
+        os.close(fd)
+
+    segments_path.replace(file_path)
+    return file_path
+
+
+class HttpRangeFile(io.RawIOBase):
+    """Read-only, seekable view of a remote file backed by HTTP Range requests."""
+
+    def __init__(self, url: str, size: int):
+        super().__init__()
+        self.url = url
+        self.name = _filename_from_url(url)
+        self.size = size
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("negative seek position")
+        self._pos = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        if self._pos >= self.size:
+            return 0
+        start = self._pos
+        end = min(start + len(buffer), self.size) - 1
+
+        def _fetch() -> bytes:
+            request = Request(self.url, headers={"Range": f"bytes={start}-{end}"})
+            with urlopen(request, timeout=120) as response:
+                if response.status != 206:
+                    raise OSError(f"server ignored Range bytes={start}-{end} (HTTP {response.status})")
+                return response.read()
+
+        data = retry(
+            operation_name=f"range:{self.name}[{start}-{end}]",
+            fn=_fetch,
+            retries=3,
+            base_delay_seconds=2,
+            logger=LOGGER,
+            retry_on=RETRYABLE_ERRORS,
+            should_retry=_is_transient,
+            max_elapsed_seconds=RETRY_DEADLINE_SECONDS,
+        )
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+def open_remote_zip(link: DownloadLink) -> io.BufferedReader:
+    """Open link for streaming reads without saving it to disk."""
+    size = _probe_ranged_size(link.href)
+    if size is None:
+        raise OSError(f"{link.href} does not support byte-range reads")
+    return io.BufferedReader(HttpRangeFile(link.href, size), buffer_size=SEGMENT_SIZE)
+
+
 def download_zip(link: DownloadLink, download_dir: Path) -> Path:
+    """Download link into download_dir.
+
+    Large files on servers that honour byte ranges are fetched as parallel
+    segments; otherwise a single stream is used, resuming any .part file.
+    """
     download_dir.mkdir(parents=True, exist_ok=True)
     file_path = download_dir / _filename_from_url(link.href)
+    part_path = file_path.with_name(f"{file_path.name}.part")
+
+    # one HEAD both validates a cached copy and decides whether to fetch in segments
+    head = None if part_path.exists() else _head(link.href)
+    remote_size = head[0] if head else None
+
+    if file_path.exists():
+        if remote_size is not None and remote_size != file_path.stat().st_size:
+            LOGGER.info("Remote copy of %s changed size, downloading again", file_path.name)
+            file_path.unlink()
+        elif _is_intact_zip(file_path):
+            LOGGER.info("Reusing verified download %s", file_path)
+            return file_path
+        else:
+            LOGGER.warning("Discarding corrupt download %s", file_path)
+            file_path.unlink()
 
     def _do_download() -> Path:
-        with urlopen(link.href, timeout=120) as response, file_path.open("wb") as out_file:
-            while True:
-                chunk = response.read(1024 * 1024)
-                if not chunk:
-                    break
-                out_file.write(chunk)
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            response = urlopen(Request(link.href, headers=headers), timeout=120)
+        except HTTPError as exc:
+            # 416 on a resume means the partial file already holds every byte
+            if exc.code != 416 or not offset:
+                raise
+            part_path.replace(file_path)
+            return file_path
+
+        with response:
+            resumed = offset > 0 and response.status == 206
+            if offset and not resumed:
+                LOGGER.info("Server ignored Range for %s, restarting download", file_path.name)
+            # reads are already READ_BLOCK_SIZE, so skip the second buffer layer
+            buffer = memoryview(bytearray(READ_BLOCK_SIZE))
+            with part_path.open("ab" if resumed else "wb", buffering=0) as out_file:
+                while size := response.readinto(buffer):
+                    out_file.write(buffer[:size])
+
+        part_path.replace(file_path)
         return file_path
 
-    local_file = retry(
-        operation_name=f"download:{file_path.name}",
-        fn=_do_download,
-        retries=3,
-        base_delay_seconds=2,
-        logger=LOGGER,
-    )
+    segmented = head is not None and head[1] and hasattr(os, "pwrite")
+    if segmented and remote_size is not None and remote_size > SEGMENT_SIZE:
+        local_file = _download_segmented(link.href, file_path, remote_size)
+    else:
+        local_file = retry(
+            operation_name=f"download:{file_path.name}",
+            fn=_do_download,
+            retries=3,
+            base_delay_seconds=2,
+            logger=LOGGER,
+            retry_on=RETRYABLE_ERRORS,
+            should_retry=_is_transient,
+            max_elapsed_seconds=RETRY_DEADLINE_SECONDS,
+        )
 
     LOGGER.info("Downloaded %s -> %s", link.href, local_file)
     return local_file
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
 from datetime import datetime
 
@@ -11,6 +12,53 @@ class DownloadLink:
     federation: str
 
 
+@dataclass(slots=True)
+class DownloadLinkBatch:
+    """Column-wise (struct-of-arrays) view of many DownloadLinks."""
+
+    hrefs: list[str] = field(default_factory=list)
+    texts: list[str] = field(default_factory=list)
+    federations: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_links(cls, links: Iterable[DownloadLink]) -> DownloadLinkBatch:
+        batch = cls()
+        for link in links:
+            batch.append(link.href, link.text, link.federation)
+        return batch
+
+    def append(self, href: str, text: str, federation: str) -> None:
+        self.hrefs.append(href)
+        self.texts.append(text)
+        self.federations.append(federation)
+
+    def _take(self, indices: list[int]) -> DownloadLinkBatch:
+        return DownloadLinkBatch(
+            hrefs=[self.hrefs[i] for i in indices],
+            texts=[self.texts[i] for i in indices],
+            federations=[self.federations[i] for i in indices],
+        )
+
+    def for_federations(self, wanted: set[str] | None) -> DownloadLinkBatch:
+        """Links whose federation is in wanted (all of them when wanted is empty or None)."""
+        if not wanted:
+            return self
+        return self._take([i for i, federation in enumerate(self.federations) if federation in wanted])
+
+    def excluding(self, hrefs: set[str]) -> DownloadLinkBatch:
+        """Links whose href is not in hrefs."""
+        if not hrefs:
+            return self
+        return self._take([i for i, href in enumerate(self.hrefs) if href not in hrefs])
+
+    def __len__(self) -> int:
+        return len(self.hrefs)
+
+    def __iter__(self) -> Iterator[DownloadLink]:
+        for href, text, federation in zip(self.hrefs, self.texts, self.federations, strict=True):
+            yield DownloadLink(href=href, text=text, federation=federation)
+
+
 @dataclass(slots=True)
 class FileProcessingStats:
     source_file: str
@@ -18,6 +66,7 @@ class FileProcessingStats:
     snapshot_period: str
     total_rows: int = 0
     written_rows: int = 0
+    invalid_rows: int = 0
     missing_required_columns: list[str] = field(default_factory=list)
     unknown_columns: list[str] = field(default_factory=list)
     errors: list[str] = field(default_factory=list)
@@ -31,6 +80,7 @@ class PipelineReport:
     selected_links: int = 0
     downloaded_files: int = 0
     processed_files: int = 0
+    skipped_files: int = 0
     expected_files: int = 0
     total_rows: int = 0
     written_rows: int = 0
@@ -40,4 +90,4 @@ class PipelineReport:
     def completeness_ratio(self) -> float:
         if self.expected_files == 0:
             return 1.0
-        return self.processed_files / self.expected_files
+        return (self.processed_files + self.skipped_files) / self.expected_files
@@ -2,12 +2,21 @@ from __future__ import annotations
 
 import logging
 import re
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO
 
+import pandas as pd
+
+from quacky_denue.browser_pool import playwright_session
 from quacky_denue.config import PipelineConfig
 from quacky_denue.discovery import discover_denue_links, validate_link_count
-from quacky_denue.download import download_zip
-from quacky_denue.models import FileProcessingStats, PipelineReport
-from quacky_denue.reader import infer_snapshot_period, iter_denue_chunks
+from quacky_denue.download import download_zip, open_remote_zip
+from quacky_denue.models import DownloadLink, DownloadLinkBatch, FileProcessingStats, PipelineReport
+from quacky_denue.reader import DenueZip, infer_snapshot_period, iter_denue_chunks
 from quacky_denue.reporting import utcnow, write_report
 from quacky_denue.schema import normalize_chunk
 from quacky_denue.storage import choose_storage_backend
@@ -16,72 +25,135 @@ LOGGER = logging.getLogger(__name__)
 TABLE_SAFE = re.compile(r"[^a-z0-9_]+")
 
 
+@lru_cache(maxsize=128)
 def _safe_table_name(snapshot_period: str) -> str:
     cleaned = TABLE_SAFE.sub("_", snapshot_period.lower()).strip("_")
     return f"denue_{cleaned or 'unknown'}"
 
 
+def _process_file(
+    link: DownloadLink,
+    download: Future[Path | BinaryIO],
+    config: PipelineConfig,
+    write: Callable[[pd.DataFrame, str, str], int],
+) -> FileProcessingStats:
+    """Parse and normalize one downloaded zip, handing chunks to the shared writer."""
+    file_stats = FileProcessingStats(
+        source_file=link.href,
+        federation=link.federation,
+        snapshot_period="unknown",
+    )
+
+    zip_source: Path | BinaryIO | None = None
+    try:
+        zip_source = download.result()
+        source_file = str(zip_source) if isinstance(zip_source, Path) else link.href
+        file_stats.source_file = source_file
+
+        with DenueZip(zip_source) as denue_zip:
+            snapshot_period = infer_snapshot_period(denue_zip)
+            file_stats.snapshot_period = snapshot_period
+            table_name = _safe_table_name(snapshot_period)
+
+            for chunk in iter_denue_chunks(denue_zip, chunk_size=config.chunk_size):
+                normalized, missing_required, unknown_cols = normalize_chunk(
+                    chunk,
+                    snapshot_period=snapshot_period,
+                    source_file=source_file,
+                    federation=link.federation,
+                )
+
+                file_stats.missing_required_columns = sorted(
+                    set(file_stats.missing_required_columns + missing_required)
+                )
+                file_stats.unknown_columns = sorted(set(file_stats.unknown_columns + unknown_cols))
+
+                file_stats.total_rows += len(normalized)
+                file_stats.written_rows += write(normalized, table_name, link.href)
+
+            file_stats.invalid_rows = denue_zip.invalid_rows
+    except Exception as exc:  # noqa: BLE001 - report and continue to next file
+        LOGGER.exception("Failed file %s: %s", link.href, exc)
+        file_stats.errors.append(str(exc))
+    finally:
+        if zip_source is not None and not isinstance(zip_source, Path):
+            zip_source.close()
+
+    return file_stats
+
+
 def run_pipeline(config: PipelineConfig) -> PipelineReport:
     report = PipelineReport(started_at=utcnow())
 
-    links = discover_denue_links(config)
-    report.discovered_links = len(links)
-    report.selected_links = len(links)
-    report.expected_files = len(links)
-
-    if not validate_link_count(config, len(links)):
-        warning = "Discovered link count did not match page badge_denue"
-        LOGGER.warning(warning)
-        report.errors.append(warning)
+    with playwright_session(config.headless, config.browser_profile_dir) as browser_session:
+        links = discover_denue_links(config, session=browser_session)
+        report.discovered_links = len(links)
+        report.expected_files = len(links)
+
+        if not validate_link_count(config, len(links), session=browser_session):
+            warning = "Discovered link count did not match page badge_denue"
+            LOGGER.warning(warning)
+            report.errors.append(warning)
+
+    storage = choose_storage_backend(
+        config.storage_backend,
+        config.duckdb_path,
+        config.parquet_dir,
+        duckdb_threads=config.duckdb_threads,
+        duckdb_memory_limit=config.duckdb_memory_limit,
+    )
+    write_lock = threading.Lock()
 
-    storage = choose_storage_backend(config.storage_backend, config.duckdb_path, config.parquet_dir)
+    def _write(df: pd.DataFrame, table_name: str, source_url: str) -> int:
+        # storage backends are single-writer; parse workers take turns here
+        with write_lock:
+            return storage.write(df, table_name, source_url)
 
     try:
-        for link in links:
-            file_stats = FileProcessingStats(
-                source_file=link.href,
-                federation=link.federation,
-                snapshot_period="unknown",
-            )
-
-            try:
-                zip_path = download_zip(link, config.download_dir)
-                report.downloaded_files += 1
-                file_stats.source_file = str(zip_path)
-
-                snapshot_period = infer_snapshot_period(zip_path)
-                file_stats.snapshot_period = snapshot_period
-                table_name = _safe_table_name(snapshot_period)
-
-                for chunk in iter_denue_chunks(zip_path, chunk_size=config.chunk_size):
-                    normalized, missing_required, unknown_cols = normalize_chunk(
-                        chunk,
-                        snapshot_period=snapshot_period,
-                        source_file=str(zip_path),
-                        federation=link.federation,
-                    )
-
-                    file_stats.missing_required_columns = sorted(
-                        set(file_stats.missing_required_columns + missing_required)
-                    )
-                    file_stats.unknown_columns = sorted(
-                        set(file_stats.unknown_columns + unknown_cols)
-                    )
-
-                    file_stats.total_rows += len(normalized)
-                    written = storage.write(normalized, table_name)
-                    file_stats.written_rows += written
-
-                report.processed_files += 1
-            except Exception as exc:  # noqa: BLE001 - report and continue to next file
-                message = f"Failed file {link.href}: {exc}"
-                LOGGER.exception(message)
-                file_stats.errors.append(str(exc))
-                report.errors.append(message)
-
-            report.total_rows += file_stats.total_rows
-            report.written_rows += file_stats.written_rows
-            report.file_reports.append(file_stats)
+        if config.skip_ingested:
+            ingested = storage.ingested_sources()
+            if ingested:
+                selected = list(DownloadLinkBatch.from_links(links).excluding(ingested))
+                report.skipped_files = len(links) - len(selected)
+                if report.skipped_files:
+                    LOGGER.info("Skipping %s links already ingested by earlier runs", report.skipped_files)
+                links = selected
+        report.selected_links = len(links)
+
+        with ThreadPoolExecutor(
+            max_workers=max(config.download_concurrency, 1),
+            thread_name_prefix="denue-download",
+        ) as download_pool, ThreadPoolExecutor(
+            max_workers=max(config.parse_workers, 1),
+            thread_name_prefix="denue-parse",
+        ) as parse_pool:
+            # downloads run ahead; parse workers pick files up as soon as they land
+            pending = []
+            for link in links:
+                if config.keep_downloaded:
+                    download = download_pool.submit(download_zip, link, config.download_dir)
+                else:
+                    download = download_pool.submit(open_remote_zip, link)
+                processing = parse_pool.submit(_process_file, link, download, config, _write)
+                pending.append((link, download, processing))
+
+            for link, download, processing in pending:
+                file_stats = processing.result()
+                if download.exception() is None:
+                    report.downloaded_files += 1
+                if file_stats.errors:
+                    report.errors.extend(f"Failed file {link.href}: {error}" for error in file_stats.errors)
+                    # a half-written file is dropped where the backend allows it, so a rerun starts clean
+                    with write_lock:
+                        file_stats.written_rows -= storage.abort_file(link.href)
+                else:
+                    report.processed_files += 1
+                    with write_lock:
+                        storage.finish_file(link.href, file_stats.written_rows)
+
+                report.total_rows += file_stats.total_rows
+                report.written_rows += file_stats.written_rows
+                report.file_reports.append(file_stats)
     finally:
         storage.close()
 
@@ -1,29 +1,43 @@
 from __future__ import annotations
 
+import codecs
+import csv
 import logging
+import mmap
+import os
 import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import BinaryIO
 from zipfile import ZipFile
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from quacky_denue.schema import STRING_DTYPE
 
 LOGGER = logging.getLogger(__name__)
 YEAR_PATTERN = re.compile(r"(20\d{2})")
+CSV_ENCODING = "latin1"
+CSV_BLOCK_SIZE = 16 * 1024 * 1024
+ENCODING_SAMPLE_BYTES = 64 * 1024
 
 
-def infer_snapshot_period(zip_file: Path) -> str:
-    year_match = YEAR_PATTERN.search(zip_file.name)
-    if year_match:
-        return year_match.group(1)
+def _period_from_name(name: str) -> str | None:
+    year_match = YEAR_PATTERN.search(Path(name).name)
+    return year_match.group(1) if year_match else None
 
-    with ZipFile(zip_file) as archive:
-        metadata = [name for name in archive.namelist() if "metadatos_denue" in name.lower()]
-        if metadata:
-            with archive.open(metadata[0]) as f:
-                first_line = f.readline().decode("latin1", errors="ignore").strip()
-                first_line = first_line.replace("Identifier:", "").strip()
-                normalized = first_line.replace(".", "_").replace("-", "_").lower()
-                return normalized
+
+def _period_from_metadata(archive: ZipFile, archive_names: list[str]) -> str:
+    metadata = [name for name in archive_names if "metadatos_denue" in name.lower()]
+    if metadata:
+        with archive.open(metadata[0]) as f:
+            first_line = f.readline().decode("latin1", errors="ignore").strip()
+            first_line = first_line.replace("Identifier:", "").strip()
+            normalized = first_line.replace(".", "_").replace("-", "_").lower()
+            return normalized
 
     return "unknown"
 
@@ -36,12 +50,185 @@ def _select_data_csv(archive_names: list[str]) -> str:
     return sorted(candidates)[0]
 
 
-def iter_denue_chunks(zip_file: Path, chunk_size: int):
+def _detect_text_encoding(sample_bytes: bytes) -> str:
+    """utf-8 only when the sample holds valid multibyte text (or a BOM); latin1 otherwise.
+
+    The sample is a prefix of the member, so anything short of positive evidence keeps
+    latin1, which decodes any byte that may follow it.
+    """
+    if sample_bytes.isascii():
+        # no evidence either way; latin1 decodes whatever follows the sample
+        return CSV_ENCODING
+    try:
+        # final=False tolerates a multibyte sequence cut at the sample boundary
+        decoded = codecs.getincrementaldecoder("utf-8")().decode(sample_bytes, final=False)
+    except UnicodeDecodeError:
+        return CSV_ENCODING
+    return CSV_ENCODING if decoded.isascii() else "utf-8"
+
+
+class _MappedFile(mmap.mmap):
+    """mmap only grew seekable() in Python 3.13; ZipFile needs it to share the handle."""
+
+    def seekable(self) -> bool:
+        return True
+
+
+def _map_file(path: Path) -> _MappedFile | None:
+    """Read-only mapping of path, or None when it cannot be mapped (e.g. empty file)."""
+    try:
+        with path.open("rb") as handle:
+            mapped = _MappedFile(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    return mapped
+
+
+def _drop_page_cache(path: Path) -> None:
+    """Tell the kernel a fully parsed zip will not be read again (no-op off POSIX)."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@dataclass(slots=True)
+class DenueZip:
+    """A DENUE archive opened once: central directory, data member, encoding and period are cached."""
+
+    source: Path | BinaryIO
+    archive: ZipFile = field(init=False, repr=False)
+    names: list[str] = field(init=False, repr=False)
+    csv_member: str = field(init=False)
+    encoding: str = field(init=False)
+    column_names: list[str] = field(init=False, repr=False)
+    snapshot_period: str = field(init=False)
+    invalid_rows: int = field(init=False, default=0)
+    _mapped: _MappedFile | None = field(init=False, default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        # local zips are read through a mapping so member reads hit the page cache without read() syscalls
+        if isinstance(self.source, Path):
+            self._mapped = _map_file(self.source)
+        self.archive = ZipFile(self._mapped if self._mapped is not None else self.source)
+        try:
+            self.names = self.archive.namelist()
+            self.snapshot_period = _period_from_name(self.name) or _period_from_metadata(
+                self.archive, self.names
+            )
+            self.csv_member = _select_data_csv(self.names)
+            with self.archive.open(self.csv_member) as handle:
+                sample = handle.read(ENCODING_SAMPLE_BYTES)
+            self.encoding = _detect_text_encoding(sample)
+            header = sample.split(b"\n", 1)[0].decode(self.encoding, errors="replace").lstrip("\ufeff")
+            self.column_names = next(csv.reader([header]))
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def name(self) -> str:
+        return Path(self.source.name).name
+
+    def close(self) -> None:
+        self.archive.close()
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+            # parsed once and kept only as an archive: leave the page cache to DuckDB
+            _drop_page_cache(self.source)
+
+    def __enter__(self) -> DenueZip:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def infer_snapshot_period(zip_file: Path | BinaryIO | DenueZip) -> str:
+    if isinstance(zip_file, DenueZip):
+        return zip_file.snapshot_period
+
+    period = _period_from_name(zip_file.name)
+    if period:
+        return period
+
     with ZipFile(zip_file) as archive:
-        csv_member = _select_data_csv(archive.namelist())
-        with archive.open(csv_member) as csv_handle:
-            reader = pd.read_csv(csv_handle, chunksize=chunk_size, low_memory=True, encoding="latin1")
-            for chunk in reader:
-                yield chunk
+        return _period_from_metadata(archive, archive.namelist())
+
+
+def _rebatch(batches: Iterable[pa.RecordBatch], chunk_size: int) -> Iterator[pa.Table]:
+    """Regroup arbitrarily sized record batches into tables of exactly chunk_size rows."""
+    pending: list[pa.RecordBatch] = []
+    pending_rows = 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_size)
+            rest = table.slice(chunk_size)
+            pending = rest.to_batches()
+            pending_rows = rest.num_rows
+
+    if pending_rows:
+        yield pa.Table.from_batches(pending)
+
+
+def _iter_open_zip_chunks(denue_zip: DenueZip, chunk_size: int) -> Iterator[pd.DataFrame]:
+    column_names = denue_zip.column_names
+
+    def _skip_invalid_row(row: pacsv.InvalidRow) -> str:
+        # a ragged row (too few or too many fields) is counted and dropped instead of failing the file
+        denue_zip.invalid_rows += 1
+        return "skip"
+
+    with denue_zip.archive.open(denue_zip.csv_member) as csv_handle:
+        reader = pacsv.open_csv(
+            csv_handle,
+            read_options=pacsv.ReadOptions(
+                encoding=denue_zip.encoding,
+                block_size=CSV_BLOCK_SIZE,
+                column_names=column_names,
+                skip_rows=1,
+            ),
+            # quoted addresses and names may span lines, and a block boundary can fall inside one
+            parse_options=pacsv.ParseOptions(
+                newlines_in_values=True,
+                invalid_row_handler=_skip_invalid_row,
+            ),
+            convert_options=pacsv.ConvertOptions(
+                column_types={name: pa.string() for name in column_names},
+                strings_can_be_null=True,
+            ),
+        )
+        for table in _rebatch(reader, chunk_size):
+            yield table.to_pandas(types_mapper={pa.string(): STRING_DTYPE}.get)
+
+    if denue_zip.invalid_rows:
+        LOGGER.warning("Skipped %s malformed rows in %s", denue_zip.invalid_rows, denue_zip.name)
+
+
+def iter_denue_chunks(zip_file: Path | BinaryIO | DenueZip, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks from a DenueZip, a local zip path or any seekable zip stream.
+
+    Parsing runs in pyarrow's multithreaded CSV reader with every column read
+    as string, so types never drift between chunks of the same file.
+    """
+    if isinstance(zip_file, DenueZip):
+        yield from _iter_open_zip_chunks(zip_file, chunk_size)
+    else:
+        with DenueZip(zip_file) as denue_zip:
+            yield from _iter_open_zip_chunks(denue_zip, chunk_size)
 
-    LOGGER.info("Finished chunked read for %s", zip_file)
+    LOGGER.info("Finished chunked read for %s", zip_file.name)
@@ -1,22 +1,50 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict
 from datetime import datetime, timezone
 from pathlib import Path
 
-from quacky_denue.models import PipelineReport
+from quacky_denue.models import FileProcessingStats, PipelineReport
 
 
 def utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def write_report(report: PipelineReport, path: Path) -> None:
-    payload = asdict(report)
-    payload["started_at"] = report.started_at.isoformat()
-    payload["finished_at"] = report.finished_at.isoformat() if report.finished_at else None
-    payload["completeness_ratio"] = round(report.completeness_ratio(), 4)
+def _file_stats_to_dict(stats: FileProcessingStats) -> dict[str, object]:
+    return {
+        "source_file": stats.source_file,
+        "federation": stats.federation,
+        "snapshot_period": stats.snapshot_period,
+        "total_rows": stats.total_rows,
+        "written_rows": stats.written_rows,
+        "invalid_rows": stats.invalid_rows,
+        "missing_required_columns": stats.missing_required_columns,
+        "unknown_columns": stats.unknown_columns,
+        "errors": stats.errors,
+    }
+
+
+def _report_to_dict(report: PipelineReport) -> dict[str, object]:
+    """Shallow dict for serialization; lists are shared, not deep-copied like asdict()."""
+    return {
+        "started_at": report.started_at.isoformat(),
+        "finished_at": report.finished_at.isoformat() if report.finished_at else None,
+        "discovered_links": report.discovered_links,
+        "selected_links": report.selected_links,
+        "downloaded_files": report.downloaded_files,
+        "processed_files": report.processed_files,
+        "skipped_files": report.skipped_files,
+        "expected_files": report.expected_files,
+        "total_rows": report.total_rows,
+        "written_rows": report.written_rows,
+        "file_reports": [_file_stats_to_dict(stats) for stats in report.file_reports],
+        "errors": report.errors,
+        "completeness_ratio": round(report.completeness_ratio(), 4),
+    }
 
+
+def write_report(report: PipelineReport, path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(_report_to_dict(report), handle, ensure_ascii=True, indent=2)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import random
 import time
 from collections.abc import Callable
 from typing import TypeVar
@@ -14,17 +15,26 @@ def retry(
     retries: int = 3,
     base_delay_seconds: float = 1.5,
     logger: logging.Logger | None = None,
+    retry_on: tuple[type[BaseException], ...] = (OSError,),
+    max_elapsed_seconds: float | None = None,
+    should_retry: Callable[[BaseException], bool] | None = None,
 ) -> T:
-    """Run fn with bounded exponential backoff retries."""
+    """Run fn with bounded, jittered exponential backoff retries.
+
+    Only exceptions in retry_on (timeouts are OSErrors) that should_retry, when given,
+    accepts are retried; anything else propagates at once. With max_elapsed_seconds
+    set, no retry is started past that deadline.
+    """
+    deadline = None if max_elapsed_seconds is None else time.monotonic() + max_elapsed_seconds
     attempt = 0
-    last_error: Exception | None = None
 
-    while attempt < retries:
+    while True:
         attempt += 1
         try:
             return fn()
-        except Exception as exc:  # noqa: BLE001 - intentionally broad for retries
-            last_error = exc
+        except retry_on as exc:
+            if should_retry is not None and not should_retry(exc):
+                raise
             if logger:
                 logger.warning(
                     "%s failed on attempt %s/%s: %s",
@@ -33,8 +43,14 @@ def retry(
                     retries,
                     exc,
                 )
-            if attempt < retries:
-                time.sleep(base_delay_seconds * (2 ** (attempt - 1)))
+            if attempt >= retries:
+                raise
 
-    assert last_error is not None
-    raise last_error
+            delay = random.uniform(0.5, 1.5) * base_delay_seconds * (2 ** (attempt - 1))
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= delay:
+                    if logger:
+                        logger.warning("%s gave up: retry deadline reached", operation_name)
+                    raise
+            time.sleep(delay)
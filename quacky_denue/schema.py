@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-import json
 import logging
 import re
+import threading
+import unicodedata
 from collections.abc import Iterable
+from functools import lru_cache
 
+import duckdb
 import pandas as pd
 
 from quacky_denue.constants import CANONICAL_COLUMNS, COLUMN_ALIASES, REQUIRED_MINIMUM_COLUMNS
@@ -12,25 +15,82 @@ from quacky_denue.constants import CANONICAL_COLUMNS, COLUMN_ALIASES, REQUIRED_M
 LOGGER = logging.getLogger(__name__)
 
 NON_ALNUM = re.compile(r"[^a-zA-Z0-9]+")
-
-
+# fold Spanish accents in one C-level pass so "Código" resolves like "codigo"
+_ACCENT_TABLE = str.maketrans(
+    "áàäâéèëêíìïîóòöôúùüûñç"
+    "ÁÀÄÂÉÈËÊÍÌÏÎÓÒÖÔÚÙÜÛÑÇ",
+    "aaaaeeeeiiiioooouuuunc"
+    "AAAAEEEEIIIIOOOOUUUUNC",
+)
+# Arrow-backed strings: the reader's columns arrive in this dtype without a copy.
+STRING_DTYPE = pd.StringDtype("pyarrow")
+_CANONICAL_SET = frozenset(CANONICAL_COLUMNS)
+_SCRATCH = threading.local()
+
+
+@lru_cache(maxsize=4096)
 def to_snake_case(text: str) -> str:
+    if not text.isascii():
+        text = text.translate(_ACCENT_TABLE)
+        if not text.isascii():
+            # rarer marks (ã, ō, ...) take the full NFKD decomposition
+            text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
     cleaned = NON_ALNUM.sub("_", text.strip()).strip("_")
     return cleaned.lower()
 
 
 def resolve_columns(columns: Iterable[str]) -> tuple[list[str], list[str]]:
-    resolved: list[str] = []
-    unknown: list[str] = []
-
-    for col in columns:
-        c = to_snake_case(col)
-        canonical = COLUMN_ALIASES.get(c, c)
-        resolved.append(canonical)
-        if canonical not in CANONICAL_COLUMNS:
-            unknown.append(canonical)
-
-    return resolved, sorted(set(unknown))
+    alias = COLUMN_ALIASES.get
+    resolved = [alias(name, name) for name in map(to_snake_case, columns)]
+    unknown = {col for col in resolved if col not in _CANONICAL_SET}
+    return resolved, sorted(unknown)
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _scratch_connection() -> duckdb.DuckDBPyConnection:
+    """In-memory DuckDB connection kept for the life of the calling (parse worker) thread."""
+    conn = getattr(_SCRATCH, "conn", None)
+    if conn is None:
+        conn = _SCRATCH.conn = duckdb.connect()
+    return conn
+
+
+@lru_cache(maxsize=256)
+def _extras_json_sql(extras: tuple[str, ...]) -> str:
+    fields = ", ".join(
+        f"{_quote_identifier(col)} := coalesce(CAST({_quote_identifier(col)} AS VARCHAR), '')"
+        for col in extras
+    )
+    return f"SELECT to_json(struct_pack({fields})) AS raw_extra_json FROM extras"
+
+
+def _extra_json_keys(columns: list[str], positions: list[int]) -> tuple[str, ...]:
+    """Unique, non-empty keys: blank headers become unnamed_<i>, repeats get _2, _3, ..."""
+    keys: list[str] = []
+    seen: set[str] = set()
+    for position in positions:
+        base = columns[position] or f"unnamed_{position}"
+        key, suffix = base, 1
+        while key in seen:
+            suffix += 1
+            key = f"{base}_{suffix}"
+        seen.add(key)
+        keys.append(key)
+    return tuple(keys)
+
+
+def _extras_to_json(extras: pd.DataFrame, keys: tuple[str, ...]) -> pd.Series:
+    """Encode extras as one JSON object per row in a single native DuckDB pass."""
+    conn = _scratch_connection()
+    conn.register("extras", extras.set_axis(keys, axis=1))
+    try:
+        encoded = conn.execute(_extras_json_sql(keys)).df()
+    finally:
+        conn.unregister("extras")
+    return encoded["raw_extra_json"].set_axis(extras.index)
 
 
 def normalize_chunk(
@@ -43,17 +103,20 @@ def normalize_chunk(
     resolved, unknown_cols = resolve_columns(df.columns)
     df.columns = resolved
 
-    missing_required = [col for col in REQUIRED_MINIMUM_COLUMNS if col not in df.columns]
+    present = set(resolved)
+
+    missing_required = [col for col in REQUIRED_MINIMUM_COLUMNS if col not in present]
 
     for col in CANONICAL_COLUMNS:
-        if col not in df.columns:
+        if col not in present:
             df[col] = None
 
     # capture unknown columns in a single JSON payload column to preserve data
-    extras = [c for c in df.columns if c not in CANONICAL_COLUMNS]
-    if extras:
-        df["raw_extra_json"] = df[extras].fillna("").to_dict(orient="records")
-        df["raw_extra_json"] = df["raw_extra_json"].map(json.dumps)
+    extra_positions = [i for i, col in enumerate(resolved) if col not in _CANONICAL_SET]
+    if extra_positions:
+        df["raw_extra_json"] = _extras_to_json(
+            df.iloc[:, extra_positions], _extra_json_keys(resolved, extra_positions)
+        )
 
     df["snapshot_period"] = snapshot_period
     df["source_file"] = source_file
@@ -61,5 +124,8 @@ def normalize_chunk(
     df["schema_version"] = "v1"
     df["extraction_ts"] = pd.Timestamp.now("UTC").isoformat()
 
-    standardized = df.loc[:, list(CANONICAL_COLUMNS)].astype("string")
+    standardized = df.loc[:, list(CANONICAL_COLUMNS)]
+    to_cast = {col: STRING_DTYPE for col, dtype in standardized.dtypes.items() if dtype != STRING_DTYPE}
+    if to_cast:
+        standardized = standardized.astype(to_cast)
     return standardized, missing_required, unknown_cols
@@ -1,60 +1,207 @@
 from __future__ import annotations
 
 import logging
+from dataclasses import dataclass
 from pathlib import Path
 from uuid import uuid4
 
 import duckdb
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 LOGGER = logging.getLogger(__name__)
+INGESTED_FILES_TABLE = "ingested_files"
+_LEDGER_UPSERT = f"INSERT OR REPLACE INTO {INGESTED_FILES_TABLE} VALUES (?, ?, current_timestamp)"
+# bulk-load settings: rows carry their own keys, and fewer checkpoints mean fewer WAL syncs
+DUCKDB_BULK_SETTINGS: dict[str, object] = {
+    "preserve_insertion_order": False,
+    "checkpoint_threshold": "1GB",
+}
 
 
 class StorageWriter:
-    def write(self, df: pd.DataFrame, table_name: str) -> int:
+    def write(self, df: pd.DataFrame, table_name: str, source_url: str | None = None) -> int:
         raise NotImplementedError
 
+    def finish_file(self, source_url: str, written_rows: int) -> None:
+        """Make every chunk written for source_url durable and record the file as ingested."""
+        return
+
+    def abort_file(self, source_url: str) -> int:
+        """Discard what was written for source_url; returns the rows that were dropped."""
+        return 0
+
+    def ingested_sources(self) -> set[str]:
+        """Source URLs fully ingested by earlier runs; backends without a ledger report none."""
+        return set()
+
     def close(self) -> None:
         return
 
 
+@dataclass(slots=True)
+class _FileTransaction:
+    cursor: duckdb.DuckDBPyConnection
+    written_rows: int = 0
+
+
 class DuckDBWriter(StorageWriter):
-    def __init__(self, db_path: Path):
+    """Append each source file's chunks in its own transaction, committed once the file is finished.
+
+    A failed append rolls back only that file, so files finished earlier are never lost and a
+    transaction DuckDB has aborted is never committed.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        threads: int | None = None,
+        memory_limit: str | None = None,
+    ):
         self.db_path = db_path
         self.conn = duckdb.connect(str(db_path))
-
-    def write(self, df: pd.DataFrame, table_name: str) -> int:
-        self.conn.register("incoming_chunk", df)
+        settings = dict(DUCKDB_BULK_SETTINGS, threads=threads, memory_limit=memory_limit)
+        for name, value in settings.items():
+            if value is not None:
+                self.conn.execute(f"SET {name} = ?", [value])
+        self._tables: set[str] = set()
+        self._files: dict[str, _FileTransaction] = {}
         self.conn.execute(
-            f"CREATE TABLE IF NOT EXISTS {table_name} AS SELECT * FROM incoming_chunk LIMIT 0"
+            f"CREATE TABLE IF NOT EXISTS {INGESTED_FILES_TABLE} ("
+            "source_url VARCHAR PRIMARY KEY, written_rows BIGINT, ingested_at TIMESTAMPTZ)"
         )
-        self.conn.execute(f"INSERT INTO {table_name} SELECT * FROM incoming_chunk")
-        self.conn.unregister("incoming_chunk")
+
+    def _ensure_table(self, df: pd.DataFrame, table_name: str) -> None:
+        # created and committed on the main connection so every file transaction sees the table
+        if table_name in self._tables:
+            return
+        self.conn.register("incoming_chunk", df)
+        try:
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table_name} AS SELECT * FROM incoming_chunk LIMIT 0"
+            )
+        finally:
+            self.conn.unregister("incoming_chunk")
+        self._tables.add(table_name)
+
+    def _file_transaction(self, source_url: str) -> _FileTransaction:
+        transaction = self._files.get(source_url)
+        if transaction is None:
+            cursor = self.conn.cursor()
+            cursor.begin()
+            transaction = self._files[source_url] = _FileTransaction(cursor)
+        return transaction
+
+    def ingested_sources(self) -> set[str]:
+        rows = self.conn.execute(f"SELECT source_url FROM {INGESTED_FILES_TABLE}").fetchall()
+        return {row[0] for row in rows}
+
+    def write(self, df: pd.DataFrame, table_name: str, source_url: str | None = None) -> int:
+        self._ensure_table(df, table_name)
+        if source_url is None:
+            # no file to group with: the append commits on its own
+            self.conn.append(table_name, df)
+            return len(df)
+
+        transaction = self._file_transaction(source_url)
+        try:
+            transaction.cursor.append(table_name, df)
+        except Exception:
+            # DuckDB has aborted the transaction: never commit it, start the file over empty
+            transaction.cursor.rollback()
+            transaction.cursor.begin()
+            raise
+        transaction.written_rows += len(df)
         return len(df)
 
+    def finish_file(self, source_url: str, written_rows: int) -> None:
+        # the ledger row commits with the file's rows, so neither is ever durable without the other
+        ledger_row = [source_url, written_rows]
+        transaction = self._files.pop(source_url, None)
+        if transaction is None:
+            # nothing was appended for this file; the ledger row commits on its own
+            self.conn.execute(_LEDGER_UPSERT, ledger_row)
+            return
+        try:
+            transaction.cursor.execute(_LEDGER_UPSERT, ledger_row)
+            transaction.cursor.commit()
+        except Exception:
+            transaction.cursor.rollback()
+            raise
+        finally:
+            transaction.cursor.close()
+
+    def abort_file(self, source_url: str) -> int:
+        # rows counted here include any already dropped by a failed append
+        transaction = self._files.pop(source_url, None)
+        if transaction is None:
+            return 0
+        try:
+            transaction.cursor.rollback()
+        finally:
+            transaction.cursor.close()
+        return transaction.written_rows
+
     def close(self) -> None:
+        for source_url in list(self._files):
+            LOGGER.warning("Rolling back unfinished file %s", source_url)
+            self.abort_file(source_url)
         self.conn.close()
 
 
 class ParquetWriter(StorageWriter):
+    """Stream every chunk of a table into one zstd Parquet file per run, one row group per chunk."""
+
     def __init__(self, parquet_dir: Path):
         self.parquet_dir = parquet_dir
         self.parquet_dir.mkdir(parents=True, exist_ok=True)
-
-    def write(self, df: pd.DataFrame, table_name: str) -> int:
-        table_dir = self.parquet_dir / table_name
-        table_dir.mkdir(parents=True, exist_ok=True)
-        output_file = table_dir / f"chunk_{uuid4().hex}.parquet"
-        df.to_parquet(output_file, index=False)
+        self._writers: dict[str, pq.ParquetWriter] = {}
+
+    def _writer_for(self, table_name: str, schema: pa.Schema) -> pq.ParquetWriter:
+        writer = self._writers.get(table_name)
+        if writer is None:
+            table_dir = self.parquet_dir / table_name
+            table_dir.mkdir(parents=True, exist_ok=True)
+            # written under .tmp and renamed on close, so the *.parquet glob only sees complete files
+            writer = pq.ParquetWriter(
+                table_dir / f"part_{uuid4().hex}.parquet.tmp",
+                schema,
+                compression="zstd",
+                compression_level=3,
+                use_dictionary=True,
+            )
+            self._writers[table_name] = writer
+        return writer
+
+    def write(self, df: pd.DataFrame, table_name: str, source_url: str | None = None) -> int:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        writer = self._writer_for(table_name, table.schema)
+        if table.schema != writer.schema:
+            table = table.cast(writer.schema)
+        writer.write_table(table)
         return len(df)
 
-
-def choose_storage_backend(storage_backend: str, duckdb_path: Path, parquet_dir: Path) -> StorageWriter:
+    def close(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+            partial = Path(writer.where)
+            partial.rename(partial.with_suffix(""))
+        self._writers.clear()
+
+
+def choose_storage_backend(
+    storage_backend: str,
+    duckdb_path: Path,
+    parquet_dir: Path,
+    duckdb_threads: int | None = None,
+    duckdb_memory_limit: str | None = None,
+) -> StorageWriter:
     backend = storage_backend.lower().strip()
 
     if backend == "duckdb":
         LOGGER.info("Using DuckDB storage backend for memory-efficient append and analytics")
-        return DuckDBWriter(duckdb_path)
+        return DuckDBWriter(duckdb_path, threads=duckdb_threads, memory_limit=duckdb_memory_limit)
 
     if backend == "parquet":
         LOGGER.info("Using Parquet storage backend (good interchange, weaker append semantics)")
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+from quacky_denue.browser_pool import CHROMIUM_LAUNCH_ARGS, _block_heavy_resources, playwright_session
+from quacky_denue.config import PipelineConfig
+
+
+@patch("quacky_denue.browser_pool.sync_playwright")
+def test_playwright_session_is_lazy(mock_playwright):
+    with playwright_session(headless=True):
+        pass
+
+    mock_playwright.assert_not_called()
+
+
+@patch("quacky_denue.browser_pool.sync_playwright")
+def test_playwright_session_launches_browser_once(mock_playwright):
+    playwright = mock_playwright.return_value.start.return_value
+    browser = playwright.chromium.launch.return_value
+
+    with playwright_session(headless=True) as session:
+        with session.acquire_page() as first_page:
+            assert first_page is browser.new_context.return_value.new_page.return_value
+        with session.acquire_page():
+            pass
+
+    playwright.chromium.launch.assert_called_once_with(headless=True, args=list(CHROMIUM_LAUNCH_ARGS))
+    assert browser.new_context.call_count == 2
+    browser.new_context.return_value.route.assert_called_with("**/*", _block_heavy_resources)
+    assert browser.new_context.return_value.close.call_count == 2
+    browser.close.assert_called_once()
+    playwright.stop.assert_called_once()
+
+
+def test_block_heavy_resources():
+    image_route = MagicMock()
+    image_route.request.resource_type = "image"
+    _block_heavy_resources(image_route)
+    image_route.abort.assert_called_once()
+    image_route.continue_.assert_not_called()
+
+    document_route = MagicMock()
+    document_route.request.resource_type = "document"
+    _block_heavy_resources(document_route)
+    document_route.continue_.assert_called_once()
+    document_route.abort.assert_not_called()
+
+
+@patch("quacky_denue.browser_pool.sync_playwright")
+def test_playwright_session_persistent_profile(mock_playwright, tmp_path):
+    playwright = mock_playwright.return_value.start.return_value
+    context = playwright.chromium.launch_persistent_context.return_value
+    profile_dir = tmp_path / "profile"
+
+    with playwright_session(headless=True, user_data_dir=profile_dir) as session:
+        with session.acquire_page() as page:
+            assert page is context.new_page.return_value
+        with session.acquire_page():
+            pass
+
+    assert profile_dir.is_dir()
+    playwright.chromium.launch_persistent_context.assert_called_once_with(
+        str(profile_dir), headless=True, args=list(CHROMIUM_LAUNCH_ARGS)
+    )
+    playwright.chromium.launch.assert_not_called()
+    assert context.new_page.return_value.close.call_count == 2
+    context.close.assert_called_once()
+
+
+@patch("quacky_denue.browser_pool.sync_playwright")
+def test_playwright_session_without_profile_uses_throwaway_contexts(mock_playwright):
+    playwright = mock_playwright.return_value.start.return_value
+
+    with playwright_session(headless=True, user_data_dir=None) as session:
+        with session.acquire_page():
+            pass
+
+    playwright.chromium.launch_persistent_context.assert_not_called()
+    playwright.chromium.launch.assert_called_once()
+
+
+def test_pipeline_config_persistent_profile_is_opt_in(tmp_path):
+    config = PipelineConfig(
+        download_url="https://fake.url",
+        download_dir=tmp_path / "downloads",
+        storage_backend="duckdb",
+        duckdb_path=tmp_path / "test.duckdb",
+        parquet_dir=tmp_path / "parquet",
+        report_path=tmp_path / "report.json",
+    )
+
+    assert config.browser_profile_dir is None
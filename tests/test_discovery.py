@@ -1,30 +1,25 @@
 from __future__ import annotations
 
+from http.client import IncompleteRead
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 from quacky_denue.config import PipelineConfig
 from quacky_denue.discovery import (
-    _parse_federation,
+    _PAGE_HTML_CACHE,
+    _collect_links,
+    _csv_zip_federation,
+    _fetch_page_html,
+    _http_badge_value,
+    _http_discover,
+    _parse_anchors,
     discover_denue_links,
     is_denue_csv_zip_url,
     validate_link_count,
 )
-from quacky_denue.models import DownloadLink
-
-
-class MockAnchor:
-    def __init__(self, href: str, text: str):
-        self._href = href
-        self._text = text
-
-    def get_attribute(self, attr: str):
-        if attr == "href":
-            return self._href
-        return None
-
-    def inner_text(self) -> str:
-        return self._text
+from quacky_denue.models import DownloadLink, DownloadLinkBatch
 
 
 def test_is_denue_csv_zip_url():
@@ -40,33 +35,35 @@ def test_is_denue_csv_zip_url():
     assert not is_denue_csv_zip_url("https://www.inegi.org.mx/contenidos/masiva/denue/2010/readme.pdf")
     assert not is_denue_csv_zip_url("https://www.inegi.org.mx/contenidos/masiva/denue/2010/denue_2010_csv.zip")
     assert not is_denue_csv_zip_url("https://www.inegi.org.mx/contenidos/masiva/denue/2015/denue_09_25022015_shp.zip")
+    assert is_denue_csv_zip_url(
+        "HTTPS://www.inegi.org.mx/contenidos/masiva/denue/2015/DENUE_09_25022015_CSV.ZIP?download=1"
+    )
+    assert not is_denue_csv_zip_url(
+        "https://www.inegi.org.mx/contenidos/masiva/denue/2015/denue_09_25022015_csv.zip.bak"
+    )
 
 
-def test_parse_federation():
-    assert _parse_federation("denue_09_2024_csv.zip", "CDMX") == "09"
-    assert _parse_federation("denue_31-32_2023_csv.zip", "Yucatán") == "31-32"
-    assert _parse_federation("some_other_file.zip", "Other") == "Other"
+def test_csv_zip_federation():
+    base = "https://www.inegi.org.mx/contenidos/masiva/denue/2024/"
+    assert _csv_zip_federation(base + "denue_09_2024_csv.zip") == "09"
+    assert _csv_zip_federation(base + "denue_31-32_2023_csv.zip") == "31-32"
+    assert _csv_zip_federation(base + "some_other_file.zip") is None
 
 
-@patch("quacky_denue.discovery.sync_playwright")
-def test_discover_denue_links(mock_playwright, tmp_path: Path):
+@patch("quacky_denue.discovery._fetch_page_html", return_value="<html><body></body></html>")
+@patch("quacky_denue.browser_pool.sync_playwright")
+def test_discover_denue_links(mock_playwright, _mock_fetch, tmp_path: Path):
     fake_links = [
-        {
-            "href": "/contenidos/masiva/denue/2010/denue_09_2010_csv.zip",
-            "text": "CDMX 2010",
-        },
-        {
-            "href": "/contenidos/masiva/denue/2020/denue_15_2020_07_csv.zip",
-            "text": "México 2020",
-        },
-        {"href": "/contenidos/masiva/denue/2010/readme.pdf", "text": "Other"},
+        ["https://www.inegi.org.mx/contenidos/masiva/denue/2010/denue_09_2010_csv.zip", "CDMX 2010"],
+        ["https://www.inegi.org.mx/contenidos/masiva/denue/2020/denue_15_2020_07_csv.zip", "México 2020"],
+        ["https://www.inegi.org.mx/contenidos/masiva/denue/2010/readme.pdf", "Other"],
     ]
 
-    mock_playwright_context = mock_playwright.return_value.__enter__.return_value
+    mock_playwright_context = mock_playwright.return_value.start.return_value
     mock_browser = mock_playwright_context.chromium.launch.return_value
     mock_context = mock_browser.new_context.return_value
     mock_page = mock_context.new_page.return_value
-    mock_page.query_selector_all.return_value = [MockAnchor(l["href"], l["text"]) for l in fake_links]
+    mock_page.eval_on_selector_all.return_value = fake_links
 
     config = PipelineConfig(
         download_url="https://www.inegi.org.mx/app/descarga/?ti=6",
@@ -84,11 +81,68 @@ def test_discover_denue_links(mock_playwright, tmp_path: Path):
     assert {l.federation for l in links} == {"09", "15"}
 
 
-@patch("quacky_denue.discovery.sync_playwright")
-def test_validate_link_count(mock_playwright, tmp_path: Path):
-    mock_playwright_context = mock_playwright.return_value.__enter__.return_value
+def test_parse_anchors():
+    html = """
+    <a class="aLink" href="/contenidos/masiva/denue/2010/denue_09_2010_csv.zip">CDMX &amp; 2010</a>
+    <a href="/contenidos/masiva/denue/2010/readme.pdf"><span>Other</span></a>
+    <a name="no-href">Skip</a>
+    """
+    assert _parse_anchors(html) == [
+        ("/contenidos/masiva/denue/2010/denue_09_2010_csv.zip", "CDMX & 2010"),
+        ("/contenidos/masiva/denue/2010/readme.pdf", "Other"),
+    ]
+    assert _parse_anchors(html, href_contains="_CSV.zip") == [
+        ("/contenidos/masiva/denue/2010/denue_09_2010_csv.zip", "CDMX & 2010"),
+    ]
+
+
+def test_collect_links_dedupes_and_filters_federations():
+    anchors = [
+        ("/contenidos/masiva/denue/2015/denue_09_25022015_csv.zip", "CDMX"),
+        ("/contenidos/masiva/denue/2015/denue_09_25022015_csv.zip", "CDMX duplicate"),
+        ("/contenidos/masiva/denue/2015/denue_15_25022015_csv.zip", "MEX"),
+        ("/contenidos/masiva/denue/2015/readme.pdf", "Other"),
+    ]
+
+    links = _collect_links(anchors, "https://www.inegi.org.mx/app/descarga/")
+    assert [(l.federation, l.text) for l in links] == [("09", "CDMX"), ("15", "MEX")]
+
+    filtered = _collect_links(anchors, "https://www.inegi.org.mx/app/descarga/", {"15"})
+    assert [l.federation for l in filtered] == ["15"]
+
+
+@patch("quacky_denue.browser_pool.sync_playwright")
+@patch("quacky_denue.discovery._fetch_page_html")
+def test_discover_denue_links_http_skips_browser(mock_fetch, mock_playwright, tmp_path: Path):
+    mock_fetch.return_value = """
+    <a href="/contenidos/masiva/denue/2015/denue_09_25022015_csv.zip">CDMX 2015</a>
+    <a href="/contenidos/masiva/denue/2015/denue_15_25022015_csv.zip">México 2015</a>
+    <span id="badge_denue">4</span>
+    """
+
+    config = PipelineConfig(
+        download_url="https://www.inegi.org.mx/app/descarga/?ti=6",
+        download_dir=tmp_path,
+        storage_backend="duckdb",
+        duckdb_path=tmp_path / "test.duckdb",
+        parquet_dir=tmp_path / "parquet",
+        report_path=tmp_path / "report.json",
+        headless=True,
+    )
+
+    links = discover_denue_links(config)
+    assert [l.federation for l in links] == ["09", "15"]
+    assert validate_link_count(config, 2) is True
+    mock_playwright.assert_not_called()
+
+
+@patch("quacky_denue.discovery._fetch_page_html", return_value="<html><body></body></html>")
+@patch("quacky_denue.browser_pool.sync_playwright")
+def test_validate_link_count(mock_playwright, _mock_fetch, tmp_path: Path):
+    mock_playwright_context = mock_playwright.return_value.start.return_value
     mock_browser = mock_playwright_context.chromium.launch.return_value
-    mock_page = mock_browser.new_page.return_value
+    mock_context = mock_browser.new_context.return_value
+    mock_page = mock_context.new_page.return_value
     mock_page.inner_text.return_value = "5"
 
     config = PipelineConfig(
@@ -104,3 +158,88 @@ def test_validate_link_count(mock_playwright, tmp_path: Path):
     assert validate_link_count(config, 3) is True
     assert validate_link_count(config, 4) is False
     assert validate_link_count(config, 5) is False
+
+
+@patch("quacky_denue.browser_pool.sync_playwright")
+@patch("quacky_denue.discovery._fetch_page_html")
+def test_validate_link_count_short_circuits_on_zero(mock_fetch, mock_playwright, tmp_path: Path):
+    config = PipelineConfig(
+        download_url="https://fake.url",
+        download_dir=tmp_path,
+        storage_backend="duckdb",
+        duckdb_path=tmp_path / "test.duckdb",
+        parquet_dir=tmp_path / "parquet",
+        report_path=tmp_path / "report.json",
+        headless=True,
+    )
+
+    assert validate_link_count(config, 0) is False
+    mock_fetch.assert_not_called()
+    mock_playwright.assert_not_called()
+
+
+@patch("quacky_denue.browser_pool.sync_playwright")
+@patch("quacky_denue.discovery._fetch_page_html")
+def test_discover_denue_links_uses_link_cache(mock_fetch, mock_playwright, tmp_path: Path):
+    mock_fetch.return_value = '<a href="/contenidos/masiva/denue/2015/denue_09_25022015_csv.zip">CDMX</a>'
+
+    config = PipelineConfig(
+        download_url="https://www.inegi.org.mx/app/descarga/?ti=6",
+        download_dir=tmp_path,
+        storage_backend="duckdb",
+        duckdb_path=tmp_path / "test.duckdb",
+        parquet_dir=tmp_path / "parquet",
+        report_path=tmp_path / "report.json",
+        headless=True,
+    )
+
+    first = discover_denue_links(config)
+    assert (tmp_path / ".cache" / "links.json").exists()
+
+    mock_fetch.return_value = "<html></html>"
+    assert discover_denue_links(config) == first
+    assert mock_fetch.call_count == 1
+
+    config.use_link_cache = False
+    mock_fetch.return_value = '<a href="/contenidos/masiva/denue/2015/denue_15_25022015_csv.zip">MEX</a>'
+    assert [l.federation for l in discover_denue_links(config)] == ["15"]
+    mock_playwright.assert_not_called()
+
+
+@patch("quacky_denue.discovery.urlopen")
+def test_fetch_page_html_reuses_recent_body(mock_urlopen):
+    response = mock_urlopen.return_value.__enter__.return_value
+    response.headers.get_content_charset.return_value = "utf-8"
+    response.read.return_value = b'<span id="badge_denue">3</span>'
+    url = "https://example.test/descarga"
+    _PAGE_HTML_CACHE.pop(url, None)
+
+    try:
+        assert _fetch_page_html(url) == _fetch_page_html(url)
+        assert mock_urlopen.call_count == 1
+    finally:
+        _PAGE_HTML_CACHE.pop(url, None)
+
+
+@pytest.mark.parametrize("error", [LookupError("unknown encoding: x-bogus"), IncompleteRead(b"<html")])
+@patch("quacky_denue.discovery._fetch_page_html")
+def test_http_fast_path_falls_back_on_bad_responses(mock_fetch, error):
+    mock_fetch.side_effect = error
+
+    assert _http_discover("https://example.test/descarga") == []
+    assert _http_badge_value("https://example.test/descarga") is None
+
+
+def test_download_link_batch_round_trip():
+    links = [
+        DownloadLink(href="https://example/denue_09_2010_csv.zip", text="CDMX", federation="09"),
+        DownloadLink(href="https://example/denue_15_2010_csv.zip", text="MEX", federation="15"),
+    ]
+
+    batch = DownloadLinkBatch.from_links(links)
+    assert batch.federations == ["09", "15"]
+    assert len(batch) == 2
+    assert list(batch) == links
+    assert list(batch.for_federations({"15"})) == links[1:]
+    assert list(batch.for_federations(None)) == links
+    assert list(batch.excluding({links[0].href})) == links[1:]
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import io
+import zipfile
+from http.client import BadStatusLine
+from pathlib import Path
+from unittest.mock import patch
+from urllib.error import HTTPError
+
+import pandas as pd
+import pytest
+
+from quacky_denue import download
+from quacky_denue.download import download_zip, open_remote_zip
+from quacky_denue.models import DownloadLink
+from quacky_denue.reader import infer_snapshot_period, iter_denue_chunks
+
+
+class FakeResponse(io.BytesIO):
+    def __init__(self, payload: bytes, status: int = 200, headers: dict[str, str] | None = None):
+        super().__init__(payload)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _ranged_server(payload: bytes):
+    def _urlopen(request, timeout=None):
+        if request.get_method() == "HEAD":
+            return FakeResponse(b"", headers={"Accept-Ranges": "bytes", "Content-Length": str(len(payload))})
+        start, end = request.get_header("Range").removeprefix("bytes=").split("-")
+        return FakeResponse(payload[int(start) : int(end) + 1], status=206)
+
+    return _urlopen
+
+
+LINK = DownloadLink(
+    href="https://www.inegi.org.mx/contenidos/masiva/denue/2015/denue_09_25022015_csv.zip",
+    text="CDMX",
+    federation="09",
+)
+
+
+@patch("quacky_denue.download.urlopen")
+def test_download_zip_writes_file(mock_urlopen, tmp_path: Path):
+    mock_urlopen.side_effect = [FakeResponse(b""), FakeResponse(b"zip-bytes")]
+
+    path = download_zip(LINK, tmp_path)
+
+    assert path == tmp_path / "denue_09_25022015_csv.zip"
+    assert path.read_bytes() == b"zip-bytes"
+    assert not (tmp_path / "denue_09_25022015_csv.zip.part").exists()
+
+
+@patch("quacky_denue.download.urlopen")
+def test_download_zip_resumes_partial_file(mock_urlopen, tmp_path: Path):
+    (tmp_path / "denue_09_25022015_csv.zip.part").write_bytes(b"zip-")
+    mock_urlopen.return_value = FakeResponse(b"bytes", status=206)
+
+    path = download_zip(LINK, tmp_path)
+
+    request = mock_urlopen.call_args.args[0]
+    assert request.get_header("Range") == "bytes=4-"
+    assert path.read_bytes() == b"zip-bytes"
+
+
+@patch("quacky_denue.download.urlopen")
+def test_download_zip_restarts_when_range_ignored(mock_urlopen, tmp_path: Path):
+    (tmp_path / "denue_09_25022015_csv.zip.part").write_bytes(b"stale")
+    mock_urlopen.return_value = FakeResponse(b"zip-bytes", status=200)
+
+    path = download_zip(LINK, tmp_path)
+
+    assert path.read_bytes() == b"zip-bytes"
+
+
+@patch("quacky_denue.download.urlopen")
+def test_download_zip_fetches_large_files_in_parallel_segments(mock_urlopen, tmp_path: Path):
+    payload = bytes(range(256)) * 40
+    mock_urlopen.side_effect = _ranged_server(payload)
+
+    with patch.object(download, "SEGMENT_SIZE", 1000):
+        path = download_zip(LINK, tmp_path)
+
+    assert path.read_bytes() == payload
+    ranges = sorted(
+        call.args[0].get_header("Range") for call in mock_urlopen.call_args_list if call.args[0].get_header("Range")
+    )
+    assert len(ranges) == 11
+    assert "bytes=10000-10239" in ranges
+    assert not list(tmp_path.glob("*.segments"))
+
+
+@patch("quacky_denue.download.urlopen")
+def test_open_remote_zip_streams_csv_chunks(mock_urlopen):
+    archive_bytes = io.BytesIO()
+    with zipfile.ZipFile(archive_bytes, "w") as archive:
+        archive.writestr("denue_09_2015.csv", pd.DataFrame({"id": [1, 2, 3]}).to_csv(index=False))
+    mock_urlopen.side_effect = _ranged_server(archive_bytes.getvalue())
+
+    with open_remote_zip(LINK) as remote:
+        assert infer_snapshot_period(remote) == "2015"
+        chunks = list(iter_denue_chunks(remote, chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+
+
+@patch("quacky_denue.download.urlopen")
+def test_download_zip_reuses_intact_cached_file(mock_urlopen, tmp_path: Path):
+    cached = tmp_path / "denue_09_25022015_csv.zip"
+    with zipfile.ZipFile(cached, "w") as archive:
+        archive.writestr("denue_09_2015.csv", "id\n1\n")
+
+    mock_urlopen.return_value = FakeResponse(b"", headers={"Content-Length": str(cached.stat().st_size)})
+
+    assert download_zip(LINK, tmp_path) == cached
+    assert mock_urlopen.call_args.args[0].get_method() == "HEAD"
+    assert mock_urlopen.call_count == 1
+
+
+@patch("quacky_denue.download.urlopen")
+def test_download_zip_refreshes_cached_file_when_remote_size_changes(mock_urlopen, tmp_path: Path):
+    cached = tmp_path / "denue_09_25022015_csv.zip"
+    with zipfile.ZipFile(cached, "w") as archive:
+        archive.writestr("denue_09_2015.csv", "id\n1\n")
+    mock_urlopen.side_effect = [
+        FakeResponse(b"", headers={"Content-Length": "9"}),
+        FakeResponse(b"zip-bytes"),
+    ]
+
+    path = download_zip(LINK, tmp_path)
+
+    assert path.read_bytes() == b"zip-bytes"
+
+
+@patch("quacky_denue.download.urlopen")
+def test_download_zip_replaces_corrupt_cached_file(mock_urlopen, tmp_path: Path):
+    (tmp_path / "denue_09_25022015_csv.zip").write_bytes(b"truncated")
+    mock_urlopen.side_effect = [FakeResponse(b""), FakeResponse(b"zip-bytes")]
+
+    path = download_zip(LINK, tmp_path)
+
+    assert path.read_bytes() == b"zip-bytes"
+
+
+@patch("quacky_denue.download.urlopen")
+def test_download_zip_replaces_cached_file_with_corrupt_deflate_stream(mock_urlopen, tmp_path: Path):
+    cached = tmp_path / "denue_09_25022015_csv.zip"
+    with zipfile.ZipFile(cached, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("denue_09_2015.csv", "".join(f"{i},NEGOCIO_{i}\n" for i in range(2000)))
+    payload = bytearray(cached.read_bytes())
+    # flip bytes inside the compressed member data, past its local header
+    for offset in range(100, 140):
+        payload[offset] ^= 0xFF
+    cached.write_bytes(bytes(payload))
+    mock_urlopen.side_effect = [FakeResponse(b""), FakeResponse(b"zip-bytes")]
+
+    path = download_zip(LINK, tmp_path)
+
+    assert path.read_bytes() == b"zip-bytes"
+
+
+@patch("quacky_denue.download.urlopen")
+def test_download_zip_does_not_retry_permanent_http_errors(mock_urlopen, tmp_path: Path):
+    not_found = HTTPError(LINK.href, 404, "Not Found", {}, None)
+    mock_urlopen.side_effect = [FakeResponse(b""), not_found, FakeResponse(b"zip-bytes")]
+
+    with pytest.raises(HTTPError):
+        download_zip(LINK, tmp_path)
+    assert mock_urlopen.call_count == 2
+
+
+def test_is_transient_retries_timeouts_and_rate_limits_only():
+    assert download._is_transient(HTTPError(LINK.href, 429, "Too Many Requests", {}, None))
+    assert download._is_transient(HTTPError(LINK.href, 503, "Unavailable", {}, None))
+    assert download._is_transient(ConnectionResetError())
+    assert not download._is_transient(HTTPError(LINK.href, 403, "Forbidden", {}, None))
+
+
+@patch("quacky_denue.download.urlopen")
+def test_download_zip_ignores_malformed_head_response(mock_urlopen, tmp_path: Path):
+    mock_urlopen.side_effect = [BadStatusLine("garbage"), FakeResponse(b"zip-bytes")]
+
+    path = download_zip(LINK, tmp_path)
+
+    assert path.read_bytes() == b"zip-bytes"
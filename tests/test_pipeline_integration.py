@@ -11,6 +11,7 @@ import pandas as pd
 from quacky_denue.config import PipelineConfig
 from quacky_denue.models import DownloadLink
 from quacky_denue.pipeline import run_pipeline
+from quacky_denue.schema import normalize_chunk
 
 
 def _write_denue_zip(zip_path: Path, csv_name: str, rows: list[dict[str, str]]) -> Path:
@@ -189,3 +190,168 @@ def test_pipeline_all_years_for_estado(mock_discover, mock_download, _mock_valid
         assert rows_2021 == 1
     finally:
         conn.close()
+
+
+@patch("quacky_denue.pipeline.validate_link_count", return_value=True)
+@patch("quacky_denue.pipeline.download_zip")
+@patch("quacky_denue.pipeline.discover_denue_links")
+def test_pipeline_reports_failed_download_and_continues(
+    mock_discover, mock_download, _mock_validate, tmp_path: Path
+):
+    zip_2021 = _write_denue_zip(
+        tmp_path / "fixtures" / "denue_09_2021_csv.zip",
+        "denue_09_2021.csv",
+        [{"id": "30", "nom_estab": "D", "codigo_act": "541110", "cve_ent": "09", "entidad": "CDMX"}],
+    )
+    links = [
+        DownloadLink(href="https://example/denue_09_2020_csv.zip", text="CDMX 2020", federation="09"),
+        DownloadLink(href="https://example/denue_09_2021_csv.zip", text="CDMX 2021", federation="09"),
+    ]
+
+    def _download(link, _download_dir):
+        if link is links[0]:
+            raise OSError("connection reset")
+        return zip_2021
+
+    mock_discover.return_value = links
+    mock_download.side_effect = _download
+
+    config = PipelineConfig(
+        download_url="https://fake.url",
+        download_dir=tmp_path / "downloads",
+        storage_backend="duckdb",
+        duckdb_path=tmp_path / "partial.duckdb",
+        parquet_dir=tmp_path / "parquet",
+        report_path=tmp_path / "report_partial.json",
+        headless=True,
+        parse_workers=2,
+    )
+
+    report = run_pipeline(config)
+    assert report.downloaded_files == 1
+    assert report.processed_files == 1
+    assert report.written_rows == 1
+    assert report.errors == ["Failed file https://example/denue_09_2020_csv.zip: connection reset"]
+    assert [stats.errors for stats in report.file_reports] == [["connection reset"], []]
+
+
+@patch("quacky_denue.pipeline.validate_link_count", return_value=True)
+@patch("quacky_denue.pipeline.download_zip")
+@patch("quacky_denue.pipeline.discover_denue_links")
+def test_pipeline_skips_links_ingested_by_earlier_run(
+    mock_discover, mock_download, _mock_validate, tmp_path: Path
+):
+    zip_2021 = _write_denue_zip(
+        tmp_path / "fixtures" / "denue_09_2021_csv.zip",
+        "denue_09_2021.csv",
+        [{"id": "30", "nom_estab": "D", "codigo_act": "541110", "cve_ent": "09", "entidad": "CDMX"}],
+    )
+    mock_discover.return_value = [
+        DownloadLink(href="https://example/denue_09_2021_csv.zip", text="CDMX 2021", federation="09")
+    ]
+    mock_download.return_value = zip_2021
+
+    config = PipelineConfig(
+        download_url="https://fake.url",
+        download_dir=tmp_path / "downloads",
+        storage_backend="duckdb",
+        duckdb_path=tmp_path / "rerun.duckdb",
+        parquet_dir=tmp_path / "parquet",
+        report_path=tmp_path / "report_rerun.json",
+        headless=True,
+    )
+
+    run_pipeline(config)
+    report = run_pipeline(config)
+
+    assert mock_download.call_count == 1
+    assert report.skipped_files == 1
+    assert report.selected_links == 0
+    assert report.completeness_ratio() == 1.0
+
+    conn = duckdb.connect(str(config.duckdb_path))
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM denue_2021").fetchone()[0] == 1
+        assert conn.execute("SELECT source_url, written_rows FROM ingested_files").fetchall() == [
+            ("https://example/denue_09_2021_csv.zip", 1)
+        ]
+    finally:
+        conn.close()
+
+
+@patch("quacky_denue.pipeline.validate_link_count", return_value=True)
+@patch("quacky_denue.pipeline.download_zip")
+@patch("quacky_denue.pipeline.discover_denue_links")
+def test_pipeline_rerun_after_partial_failure_does_not_duplicate_rows(
+    mock_discover, mock_download, _mock_validate, tmp_path: Path
+):
+    zip_2021 = _write_denue_zip(
+        tmp_path / "fixtures" / "denue_09_2021_csv.zip",
+        "denue_09_2021.csv",
+        [
+            {"id": "30", "nom_estab": "D", "codigo_act": "541110", "cve_ent": "09", "entidad": "CDMX"},
+            {"id": "31", "nom_estab": "E", "codigo_act": "541110", "cve_ent": "09", "entidad": "CDMX"},
+        ],
+    )
+    mock_discover.return_value = [
+        DownloadLink(href="https://example/denue_09_2021_csv.zip", text="CDMX 2021", federation="09")
+    ]
+    mock_download.return_value = zip_2021
+
+    config = PipelineConfig(
+        download_url="https://fake.url",
+        download_dir=tmp_path / "downloads",
+        storage_backend="duckdb",
+        duckdb_path=tmp_path / "partial_rerun.duckdb",
+        parquet_dir=tmp_path / "parquet",
+        report_path=tmp_path / "report_partial_rerun.json",
+        headless=True,
+        chunk_size=1,
+    )
+
+    # the first chunk is written, then the file fails on the second
+    real_normalize = normalize_chunk
+    calls = []
+
+    def _flaky_normalize(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise ValueError("bad chunk")
+        return real_normalize(*args, **kwargs)
+
+    with patch("quacky_denue.pipeline.normalize_chunk", side_effect=_flaky_normalize):
+        failed = run_pipeline(config)
+    assert failed.written_rows == 0
+
+    report = run_pipeline(config)
+    assert report.skipped_files == 0
+    assert report.written_rows == 2
+
+    conn = duckdb.connect(str(config.duckdb_path))
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM denue_2021").fetchone()[0] == 2
+    finally:
+        conn.close()
+
+
+def test_pipeline_config_keeps_paths_as_given():
+    config = PipelineConfig(
+        download_url="https://fake.url",
+        download_dir="data/downloads",
+        storage_backend="duckdb",
+        duckdb_path="data/denue.duckdb",
+        parquet_dir="data/parquet",
+        report_path="reports/report.json",
+    )
+
+    # source_file stores download paths, so they must not become machine-specific
+    assert config.download_dir == Path("data/downloads")
+    assert config.link_cache_dir == Path("data/downloads/.cache")
+
+
+    # derived dirs follow a later override unless they were set explicitly
+    config.download_dir = Path("elsewhere")
+    assert config.link_cache_dir == Path("elsewhere/.cache")
+    config.link_cache_dir = Path("shared/cache")
+    config.download_dir = Path("third")
+    assert config.link_cache_dir == Path("shared/cache")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import zipfile
 from pathlib import Path
 from unittest.mock import patch
@@ -7,7 +8,14 @@ from unittest.mock import patch
 import pandas as pd
 import pytest
 
-from quacky_denue.reader import _select_data_csv, infer_snapshot_period, iter_denue_chunks
+from quacky_denue.reader import (
+    ENCODING_SAMPLE_BYTES,
+    DenueZip,
+    _detect_text_encoding,
+    _select_data_csv,
+    infer_snapshot_period,
+    iter_denue_chunks,
+)
 
 
 def test_infer_snapshot_period_from_filename(tmp_path: Path):
@@ -38,3 +46,88 @@ def test_iter_denue_chunks(tmp_path: Path):
     assert len(chunks) == 2
     assert len(chunks[0]) == 2
     assert len(chunks[1]) == 1
+
+
+def test_iter_denue_chunks_keeps_codes_as_text(tmp_path: Path):
+    zip_path = tmp_path / "test.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("denue_09_2020.csv", "id,cve_ent,nom_estab\n1,09,Caf\xe9\n2,,B\n".encode("latin1"))
+
+    (chunk,) = list(iter_denue_chunks(zip_path, chunk_size=10))
+    assert list(chunk["cve_ent"].iloc[:1]) == ["09"]
+    assert pd.isna(chunk["cve_ent"].iloc[1])
+    assert chunk["nom_estab"].iloc[0] == "Café"
+
+
+def test_iter_denue_chunks_skips_ragged_rows_and_keeps_multiline_values(tmp_path: Path):
+    zip_path = tmp_path / "denue_09_2020_csv.zip"
+    body = (
+        'id,nom_estab,calle\n'
+        '1,A,"AV. REFORMA\nINTERIOR 5"\n'
+        "2,B\n"
+        "3,C,JUAREZ,EXTRA\n"
+        "4,D,MADERO\n"
+    )
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("denue_09_2020.csv", body)
+
+    # a tiny block size puts a block boundary inside the quoted multi-line value
+    with patch("quacky_denue.reader.CSV_BLOCK_SIZE", 32), DenueZip(zip_path) as denue_zip:
+        chunks = list(iter_denue_chunks(denue_zip, chunk_size=10))
+        assert denue_zip.invalid_rows == 2
+
+    (chunk,) = chunks
+    assert list(chunk["id"]) == ["1", "4"]
+    assert chunk["calle"].iloc[0] == "AV. REFORMA\nINTERIOR 5"
+
+
+def test_detect_text_encoding():
+    assert _detect_text_encoding(b"id,nom_estab\n1,A\n") == "latin1"
+    assert _detect_text_encoding("nom_estab\nCafé".encode("utf-8")) == "utf-8"
+    assert _detect_text_encoding("nom_estab\nCafé á".encode("utf-8")[:-1]) == "utf-8"
+    assert _detect_text_encoding("nom_estab\nCafé".encode("utf-8")[:-1]) == "latin1"
+    assert _detect_text_encoding("nom_estab\nCafé y más".encode("latin1")) == "latin1"
+
+
+def test_denue_zip_reads_latin1_bytes_beyond_encoding_sample(tmp_path: Path):
+    zip_path = tmp_path / "denue_09_2020_csv.zip"
+    ascii_rows = "".join(f"{i},NEGOCIO_{i:05d},CIUDAD\n" for i in range(5000)).encode("ascii")
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("denue_09_2020.csv", b"id,nom_estab,entidad\n" + ascii_rows + b"9999,CAF\xc9,M\xc9XICO\n")
+    assert len(ascii_rows) > ENCODING_SAMPLE_BYTES
+
+    with DenueZip(zip_path) as denue_zip:
+        assert denue_zip.encoding == "latin1"
+        chunks = list(iter_denue_chunks(denue_zip, chunk_size=10_000))
+
+    assert chunks[-1]["entidad"].iloc[-1] == "MÉXICO"
+
+
+def test_denue_zip_reads_metadata_once(tmp_path: Path):
+    zip_path = tmp_path / "denue_09_csv.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("conjunto_de_datos/denue_inegi_09_.csv", "\ufeffid,nom_estab\n1,Café\n".encode("utf-8"))
+        zf.writestr("metadatos/metadatos_denue.txt", "Identifier: DENUE-2023.11")
+
+    with DenueZip(zip_path) as denue_zip:
+        assert denue_zip._mapped is not None
+        assert denue_zip.csv_member == "conjunto_de_datos/denue_inegi_09_.csv"
+        assert denue_zip.encoding == "utf-8"
+        assert denue_zip.column_names == ["id", "nom_estab"]
+        assert infer_snapshot_period(denue_zip) == "denue_2023_11"
+        (chunk,) = list(iter_denue_chunks(denue_zip, chunk_size=10))
+
+    assert chunk["nom_estab"].iloc[0] == "Café"
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="posix_fadvise not available")
+def test_denue_zip_drops_page_cache_on_close(tmp_path: Path):
+    zip_path = tmp_path / "denue_09_2020_csv.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("denue_09_2020.csv", "id\n1\n")
+
+    with patch("quacky_denue.reader.os.posix_fadvise") as mock_fadvise:
+        with DenueZip(zip_path):
+            mock_fadvise.assert_not_called()
+
+    assert mock_fadvise.call_args.args[1:] == (0, 0, os.POSIX_FADV_DONTNEED)
@@ -13,7 +13,7 @@ def test_retry_success():
     def flaky():
         calls.append(1)
         if len(calls) < 2:
-            raise ValueError("fail once")
+            raise OSError("fail once")
         return "ok"
 
     result = retry("test", flaky, retries=3, base_delay_seconds=0.01)
@@ -23,9 +23,9 @@ def test_retry_success():
 
 def test_retry_exhaustion():
     def always_fail():
-        raise ValueError("boom")
+        raise OSError("boom")
 
-    with pytest.raises(ValueError, match="boom"):
+    with pytest.raises(OSError, match="boom"):
         retry("test", always_fail, retries=2, base_delay_seconds=0.01)
 
 
@@ -37,6 +37,48 @@ def test_retry_logs(caplog):
         raise ValueError("fail")
 
     with pytest.raises(ValueError):
-        retry("test", fail_once, retries=2, base_delay_seconds=0.01, logger=logger)
+        retry("test", fail_once, retries=2, base_delay_seconds=0.01, logger=logger, retry_on=(ValueError,))
 
     assert "test failed on attempt 1/2" in caplog.text
+
+
+def test_retry_does_not_retry_other_errors():
+    calls = []
+
+    def bad_input():
+        calls.append(1)
+        raise KeyError("missing")
+
+    with pytest.raises(KeyError):
+        retry("test", bad_input, retries=3, base_delay_seconds=0.01)
+    assert len(calls) == 1
+
+
+def test_retry_stops_at_deadline():
+    calls = []
+
+    def always_fail():
+        calls.append(1)
+        raise OSError("slow server")
+
+    with pytest.raises(OSError):
+        retry("test", always_fail, retries=5, base_delay_seconds=10, max_elapsed_seconds=1)
+    assert len(calls) == 1
+
+
+def test_retry_stops_when_predicate_rejects_error():
+    calls = []
+
+    def not_found():
+        calls.append(1)
+        raise OSError("HTTP 404")
+
+    with pytest.raises(OSError):
+        retry(
+            "test",
+            not_found,
+            retries=3,
+            base_delay_seconds=0.01,
+            should_retry=lambda exc: "404" not in str(exc),
+        )
+    assert len(calls) == 1
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import json
+
 import pandas as pd
 import pytest
 
-from quacky_denue.schema import normalize_chunk, resolve_columns, to_snake_case
+from quacky_denue.schema import STRING_DTYPE, normalize_chunk, resolve_columns, to_snake_case
 
 
 def test_to_snake_case():
     assert to_snake_case("Nombre De La Actividad") == "nombre_de_la_actividad"
     assert to_snake_case("codigo_act") == "codigo_act"
     assert to_snake_case("  Tipo  Vial  ") == "tipo_vial"
+    assert to_snake_case("Código de la clase de actividad") == "codigo_de_la_clase_de_actividad"
+    assert to_snake_case("Nombre de la Unidad Económica") == "nombre_de_la_unidad_economica"
+    assert to_snake_case("São Tomé") == "sao_tome"
 
 
 def test_resolve_columns():
@@ -48,3 +53,51 @@ def test_normalize_chunk():
     assert missing_required == []
     assert unknown_cols == ["extra_field"]
     assert "raw_extra_json" in normalized.columns
+
+
+def test_normalize_chunk_extras_json():
+    df = pd.DataFrame({
+        "id": ["1", "2"],
+        "extra field": ['say "hi"', None],
+        "other": ["a", "b"],
+    })
+
+    normalized, _, unknown_cols = normalize_chunk(
+        df,
+        snapshot_period="2024",
+        source_file="test.csv",
+        federation="09",
+    )
+
+    assert unknown_cols == ["extra_field", "other"]
+    assert [json.loads(value) for value in normalized["raw_extra_json"]] == [
+        {"extra_field": 'say "hi"', "other": "a"},
+        {"extra_field": "", "other": "b"},
+    ]
+
+
+
+def test_normalize_chunk_extras_json_handles_blank_and_colliding_headers():
+    # a trailing header comma gives a blank name; "Extra A" and "extra_a" snake-case alike
+    df = pd.DataFrame([["1", "x", "y", "z"]], columns=["id", "Extra A", "extra_a", ""])
+
+    normalized, _, _ = normalize_chunk(df, snapshot_period="2024", source_file="test.csv", federation="09")
+
+    assert json.loads(normalized["raw_extra_json"].iloc[0]) == {"extra_a": "x", "extra_a_2": "y", "unnamed_3": "z"}
+
+
+def test_normalize_chunk_extras_json_is_compact_utf8():
+    df = pd.DataFrame({"id": ["1"], "ciudad": ["México"]})
+
+    normalized, _, _ = normalize_chunk(df, snapshot_period="2024", source_file="test.csv", federation="09")
+
+    assert normalized["raw_extra_json"].iloc[0] == '{"ciudad":"México"}'
+
+
+def test_normalize_chunk_outputs_string_columns():
+    df = pd.DataFrame({"id": pd.array(["1"], dtype=STRING_DTYPE), "per_ocu": [5]})
+
+    normalized, _, _ = normalize_chunk(df, snapshot_period="2024", source_file="test.csv", federation="09")
+
+    assert set(normalized.dtypes) == {STRING_DTYPE}
+    assert normalized["per_ocu"].iloc[0] == "5"
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import duckdb
 import pandas as pd
 import pytest
 
@@ -13,13 +14,70 @@ def test_duckdb_writer(tmp_path):
 
     written = writer.write(df, "test_table")
     assert written == 2
+    writer.close()
 
-    # verify via connection
+    # verify via connection once the transaction is committed
     import duckdb
     conn = duckdb.connect(str(db_path))
     result = conn.execute("SELECT COUNT(*) FROM test_table").fetchone()
     assert result[0] == 2
     conn.close()
+
+
+def test_duckdb_writer_commits_each_file_on_finish(tmp_path):
+    db_path = tmp_path / "test.duckdb"
+    writer = DuckDBWriter(db_path)
+    df = pd.DataFrame({"id": ["1"], "name": ["A"]})
+
+    for _ in range(5):
+        writer.write(df, "test_table", "https://example/a.zip")
+    writer.write(df, "other_table", "https://example/b.zip")
+    writer.finish_file("https://example/a.zip", 5)
+    # b.zip is never finished, so close() rolls it back
+    writer.close()
+
+    import duckdb
+    conn = duckdb.connect(str(db_path))
+    assert conn.execute("SELECT COUNT(*) FROM test_table").fetchone()[0] == 5
+    assert conn.execute("SELECT COUNT(*) FROM other_table").fetchone()[0] == 0
+    conn.close()
+
+
+def test_duckdb_writer_failed_append_keeps_earlier_files(tmp_path):
+    db_path = tmp_path / "test.duckdb"
+    writer = DuckDBWriter(db_path)
+    good = pd.DataFrame({"id": ["1"], "name": ["A"]})
+
+    writer.write(good, "test_table", "https://example/good.zip")
+    writer.finish_file("https://example/good.zip", 1)
+    writer.write(good, "test_table", "https://example/bad.zip")
+    with pytest.raises(duckdb.Error):
+        bad = pd.DataFrame({"id": ["2"], "name": ["B"], "extra": ["x"]})
+        writer.write(bad, "test_table", "https://example/bad.zip")
+    assert writer.abort_file("https://example/bad.zip") == 1
+
+    writer.write(good, "test_table", "https://example/next.zip")
+    writer.finish_file("https://example/next.zip", 1)
+    writer.close()
+
+    conn = duckdb.connect(str(db_path))
+    assert conn.execute("SELECT COUNT(*) FROM test_table").fetchone()[0] == 2
+    # the failed file left no ledger row, so the next run loads it again
+    assert sorted(row[0] for row in conn.execute("SELECT source_url FROM ingested_files").fetchall()) == [
+        "https://example/good.zip",
+        "https://example/next.zip",
+    ]
+    conn.close()
+
+
+def test_duckdb_writer_applies_settings(tmp_path):
+    writer = DuckDBWriter(tmp_path / "test.duckdb", threads=1, memory_limit="512MB")
+
+    threads, order = writer.conn.execute(
+        "SELECT current_setting('threads'), current_setting('preserve_insertion_order')"
+    ).fetchone()
+    assert threads == 1
+    assert order is False
     writer.close()
 
 
@@ -28,15 +86,17 @@ def test_parquet_writer(tmp_path):
     writer = ParquetWriter(parquet_dir)
     df = pd.DataFrame({"id": [1, 2], "name": ["A", "B"]})
 
-    written = writer.write(df, "test_table")
-    assert written == 2
+    assert writer.write(df, "test_table") == 2
+    assert writer.write(df, "test_table") == 2
+    # an unfinished file has no footer and must not match the table glob
+    assert not list((parquet_dir / "test_table").glob("*.parquet"))
+    writer.close()
 
-    # verify file exists and can be read
+    # chunks of one table share a single file, readable once the writer is closed
     files = list((parquet_dir / "test_table").glob("*.parquet"))
     assert len(files) == 1
     df_read = pd.read_parquet(files[0])
-    assert len(df_read) == 2
-    writer.close()
+    assert len(df_read) == 4
 
 
 def test_choose_storage_backend(tmp_path):